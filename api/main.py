@@ -1,69 +1,1000 @@
-from fastapi import FastAPI, Query, Path, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, Query, Path, HTTPException, Request, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 import asyncio
+import base64
+import binascii
+import datetime
+import fcntl
+import glob
+import hashlib
+import io
+import json
+import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+from pydantic import BaseModel, Field
+from typing import Literal
 
 AWS_ACCESS_KEY_ID=os.environ.get('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY=os.environ.get('AWS_SECRET_ACCESS_KEY')
 AWS_REGION=os.environ.get('AWS_REGION')
 BUCKET_NAME=os.environ.get('BUCKET_NAME')
-DB_FILE = "local.duckdb"
+DB_FILE_PREFIX = "local"
+GOLD_SNAPSHOT_MANIFEST_KEY = "terceirizados/gold/snapshot/manifest.json"
+#delta: baixa apenas as partições alteradas do snapshot da camada gold | completo: baixa o arquivo .duckdb inteiro
+REFRESH_MODE = os.environ.get('MODO_ATUALIZACAO', 'delta')
+#local: baixa a camada gold para um banco DuckDB local | s3: consulta os arquivos parquet do snapshot direto no S3
+SERVING_MODE = os.environ.get('MODO_SERVICO', 'local')
+#Endpoint S3 alternativo (ex: MinIO ou moto em http://localhost:9000). Vazio usa a AWS
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None
+#Memória do DuckDB no modo s3, que inclui o cache em memória dos blocos lidos do S3 (external_file_cache)
+S3_MEMORY_LIMIT = os.environ.get('LIMITE_MEMORIA_S3', '1GB')
+#Spill em disco das consultas no modo s3 (temp_directory do DuckDB): não guarda dados lidos do S3
+S3_SPILL_DISK_LIMIT = os.environ.get('LIMITE_DISCO_SPILL_S3', '2GB')
+S3_SPILL_DIRECTORY = os.environ.get('DIRETORIO_SPILL_S3', '/tmp/duckdb_s3_spill')
+#Cache de respostas em memória: quantidade máxima de respostas e tempo de vida de cada uma (segundos)
+RESPONSE_CACHE_SIZE = int(os.environ.get('CACHE_RESPOSTAS_TAMANHO', '2048'))
+RESPONSE_CACHE_TTL = float(os.environ.get('CACHE_RESPOSTAS_TTL', '300'))
+#Quantidade de linhas de cada lote lido do DuckDB e enviado na exportação em streaming
+EXPORT_BATCH_ROWS = int(os.environ.get('LINHAS_POR_LOTE_EXPORTACAO', '100000'))
+#Quantidade máxima de ids por requisição da consulta em lote
+BATCH_MAX_IDS = int(os.environ.get('MAXIMO_IDS_LOTE', '1000'))
+#Consultas mais lentas que o limite (ms) são registradas no log com o plano do EXPLAIN ANALYZE
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('LIMITE_CONSULTA_LENTA_MS', '500'))
+#Quantidade máxima de EXPLAIN ANALYZE de consultas lentas rodando ao mesmo tempo em cada worker. Consultas lentas
+#que chegam com todos em uso são registradas no log sem o plano, para não dobrar a carga de um banco já lento
+SLOW_QUERY_MAX_EXPLAINS = int(os.environ.get('MAXIMO_EXPLAIN_CONSULTA_LENTA', '1'))
+#Tabela consultada pelos endpoints: terceirizados_gold (todos os meses) ou terceirizados_atual (último mês de referência)
+SERVED_TABLE = os.environ.get('TABELA_SERVICO', 'terceirizados_gold')
+#Diretório compartilhado pelos workers da API no mesmo host: versões do banco, geração publicada, lock e jobs de atualização
+DATA_DIRECTORY = os.environ.get('DIRETORIO_DADOS', '.')
+GENERATION_FILE = os.path.join(DATA_DIRECTORY, "geracao.json")
+REFRESH_LOCK_FILE = os.path.join(DATA_DIRECTORY, "atualizacao.lock")
+JOBS_DIRECTORY = os.path.join(DATA_DIRECTORY, "jobs")
+#Intervalo (segundos) entre as leituras da geração publicada, com que cada worker passa a servir a versão mais recente
+GENERATION_POLL_INTERVAL = float(os.environ.get('INTERVALO_GERACAO_SEGUNDOS', '2'))
+#Tempo (segundos) durante o qual o status de um job de atualização fica disponível
+JOB_RETENTION = float(os.environ.get('RETENCAO_JOBS_SEGUNDOS', '86400'))
+#Diretório das métricas compartilhadas pelos workers (modo multiprocesso do prometheus_client), esvaziado antes
+#de iniciar os workers. Vazio mantém as métricas em memória, corretas apenas com um worker
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+logger = logging.getLogger("terceirizados.api")
+
+REQUEST_LATENCY = Histogram("api_request_duration_seconds", "Tempo de resposta das requisições por rota",
+                            ["method", "route", "status"])
+#No modo multiprocesso, os gauges somam os workers vivos ou, nos dados servidos, trazem um valor por worker (pid)
+REQUESTS_IN_PROGRESS = Gauge("api_requests_in_progress", "Requisições em andamento", ["method"],
+                             multiprocess_mode="livesum")
+THREAD_QUEUE_DEPTH = Gauge("api_thread_pool_queue_depth",
+                           "Tarefas enviadas ao pool de threads (asyncio.to_thread) aguardando uma thread livre",
+                           multiprocess_mode="livesum")
+THREAD_POOL_BUSY = Gauge("api_thread_pool_busy", "Tarefas em execução no pool de threads", multiprocess_mode="livesum")
+QUERY_DURATION = Histogram("api_duckdb_query_duration_seconds", "Tempo de execução das consultas DuckDB por rota",
+                           ["route"])
+FETCH_DURATION = Histogram("api_duckdb_fetch_duration_seconds",
+                           "Tempo de leitura dos resultados das consultas DuckDB por rota (fetch e lotes Arrow em streaming)",
+                           ["route"])
+SLOW_QUERIES = Counter("api_duckdb_slow_queries_total", "Consultas DuckDB acima do limite de consulta lenta", ["route"])
+REFRESH_DURATION = Histogram("api_refresh_duration_seconds", "Tempo de atualização dos dados servidos",
+                             ["modo", "resultado"], buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800))
+SNAPSHOT_AGE = Gauge("api_snapshot_age_seconds", "Tempo desde que a versão servida dos dados foi carregada",
+                     multiprocess_mode="liveall")
+SNAPSHOT_ROWS = Gauge("api_snapshot_rows", "Registros da tabela gold na versão servida", multiprocess_mode="liveall")
+SNAPSHOT_GENERATION = Gauge("api_snapshot_generation", "Geração dos dados servida pelo worker",
+                            multiprocess_mode="liveall")
+
+#Rota da requisição em andamento, usada para rotular as métricas das consultas feitas nas threads do pool
+current_route = ContextVar("current_route", default="sem_rota")
+
+async def track_route(request: Request):
+    """
+    Dependência global que registra a rota da requisição para as métricas das consultas DuckDB.
+    """
+    route = request.scope.get("route")
+    current_route.set(route.path if route else request.url.path)
 
 app = FastAPI(
     title="Terceirizados do Governo Federal",
-    description="API pública somente leitura para consulta de dados de terceirizados do governo federal brasileiro."
+    description="API pública somente leitura para consulta de dados de terceirizados do governo federal brasileiro.",
+    dependencies=[Depends(track_route)]
 )
 
-def load_data():
+@app.middleware("http")
+async def measure_requests(request: Request, call_next):
     """
-    Carrega os dados do banco de dados S3 para construir o banco DuckDB local.
-    Cria arquivo temporário para que a atualização seja atômica.
+    Mede o tempo de resposta de cada requisição por rota e a quantidade de requisições em andamento.
+    Em respostas em streaming, o tempo medido vai até o envio dos cabeçalhos.
+    """
+    start = time.perf_counter()
+    in_progress = REQUESTS_IN_PROGRESS.labels(request.method)
+    in_progress.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        in_progress.dec()
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(request.method, route.path if route else "sem_rota", str(status)).observe(time.perf_counter() - start)
+
+async def run_in_thread(function, *args):
+    """
+    Executa uma função bloqueante no pool de threads (asyncio.to_thread), medindo quantas tarefas
+    aguardam uma thread livre e quantas estão em execução.
+
+    A tarefa sai da fila uma única vez: quando a thread começa a executá-la ou, se a requisição for cancelada
+    (ex: cliente desconectado) antes disso, no finally da espera, para que a métrica não acumule tarefas canceladas.
+    """
+    lock = threading.Lock()
+    queued = [True]
+    def leave_queue():
+        with lock:
+            if queued[0]:
+                queued[0] = False
+                THREAD_QUEUE_DEPTH.dec()
+    def run():
+        leave_queue()
+        with THREAD_POOL_BUSY.track_inprogress():
+            return function(*args)
+    THREAD_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.to_thread(run)
+    finally:
+        leave_queue()
+
+class InstrumentedCursor:
+    """
+    Cursor DuckDB que mede o tempo de cada consulta e registra no log, com o plano do EXPLAIN ANALYZE,
+    as consultas mais lentas que LIMITE_CONSULTA_LENTA_MS. A leitura dos resultados (fetch e lotes Arrow
+    em streaming) é medida à parte. Os demais métodos são os do cursor original.
+    """
+    def __init__(self, cursor: duckdb.DuckDBPyConnection, snapshot):
+        self._cursor = cursor
+        self._snapshot = snapshot
+
+    def sql(self, query: str, params: list = None):
+        return self.execute(query, params)
+
+    def execute(self, query: str, params: list = None):
+        start = time.perf_counter()
+        self._cursor.execute(query, params or [])
+        elapsed = time.perf_counter() - start
+        route = current_route.get()
+        QUERY_DURATION.labels(route).observe(elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            SLOW_QUERIES.labels(route).inc()
+            if _explain_slots.acquire(blocking=False):
+                self._snapshot.acquire()
+                _explain_executor.submit(explain_slow_query, self._snapshot, route, query, params, elapsed)
+            else:
+                logger.warning(f"Consulta lenta em {route}: {elapsed * 1000:.0f} ms (EXPLAIN ANALYZE descartado: "
+                               f"{SLOW_QUERY_MAX_EXPLAINS} em andamento)\n{query}")
+        #O resultado é lido pelos métodos deste cursor, que medem o tempo dos fetch
+        return self
+
+    def _timed_fetch(self, name: str, *args):
+        start = time.perf_counter()
+        try:
+            return getattr(self._cursor, name)(*args)
+        finally:
+            FETCH_DURATION.labels(current_route.get()).observe(time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._timed_fetch("fetchone")
+
+    def fetchmany(self, size: int = 1):
+        return self._timed_fetch("fetchmany", size)
+
+    def fetchall(self):
+        return self._timed_fetch("fetchall")
+
+    def fetch_arrow_table(self, *args):
+        return self._timed_fetch("fetch_arrow_table", *args)
+
+    def fetch_record_batch(self, rows_per_batch: int = 1000000):
+        """
+        Leitor dos lotes Arrow do resultado que soma o tempo de leitura de cada lote e registra o total
+        quando o streaming termina ou é interrompido. A rota é lida agora, pois os lotes são lidos fora
+        do contexto da requisição.
+        """
+        route = current_route.get()
+        start = time.perf_counter()
+        reader = self._cursor.fetch_record_batch(rows_per_batch)
+        elapsed = time.perf_counter() - start
+
+        def batches():
+            nonlocal elapsed
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        batch = reader.read_next_batch()
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield batch
+            finally:
+                FETCH_DURATION.labels(route).observe(elapsed)
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+_explain_executor = ThreadPoolExecutor(max_workers=SLOW_QUERY_MAX_EXPLAINS, thread_name_prefix="explain")
+_explain_slots = threading.Semaphore(SLOW_QUERY_MAX_EXPLAINS)
+
+def explain_slow_query(snapshot, route: str, query: str, params: list, elapsed: float):
+    """
+    Registra no log uma consulta lenta com o perfil do EXPLAIN ANALYZE, executado em segundo plano
+    na mesma versão do banco, para não atrasar a resposta da requisição. Roda no pool limitado a
+    MAXIMO_EXPLAIN_CONSULTA_LENTA e libera a vaga reservada por `InstrumentedCursor.execute` ao terminar.
+    """
+    try:
+        cursor = snapshot.connection.cursor()
+        try:
+            plan = "\n".join(row[-1] for row in cursor.execute(f"EXPLAIN ANALYZE {query}", params or []).fetchall())
+            logger.warning(f"Consulta lenta em {route}: {elapsed * 1000:.0f} ms\nParâmetros: {params}\n{query}\n{plan}")
+        except Exception as e:
+            logger.warning(f"Consulta lenta em {route}: {elapsed * 1000:.0f} ms (EXPLAIN ANALYZE falhou: {e})\n{query}")
+        finally:
+            cursor.close()
+    finally:
+        snapshot.release()
+        _explain_slots.release()
+
+class DatabaseSnapshot:
+    """
+    Conexão somente leitura com uma versão do banco DuckDB local, compartilhada por todas as requisições.
+
+    Cada consulta usa um cursor próprio da conexão, que reaproveita os metadados e o cache de blocos
+    do banco já aberto. Quando uma nova versão do banco é carregada, a versão anterior é aposentada:
+    a conexão só é fechada quando as consultas em andamento nela terminam. O arquivo é compartilhado
+    com os outros workers e é apagado na publicação seguinte (`remove_old_versions`).
+    """
+    def __init__(self, path: str | None, version: str = None, manifest: dict = None,
+                 connection: duckdb.DuckDBPyConnection = None, generation: int = 0):
+        self.path = path
+        self.version = version
+        self.manifest = manifest
+        self.generation = generation
+        self.connection = connection or duckdb.connect(path, read_only=True)
+        self._lock = threading.Lock()
+        self._active_queries = 0
+        self._retired = False
+        self.loaded_at = time.time()
+        self.total_rows = self._count_rows()
+
+    def _count_rows(self):
+        """
+        Conta os registros da tabela servida uma única vez por versão do banco, em vez de a cada requisição.
+        Retorna None se a tabela não existir (banco vazio).
+        """
+        try:
+            return self.connection.execute(f"SELECT COUNT(*) FROM {SERVED_TABLE}").fetchone()[0]
+        except duckdb.Error:
+            return None
+
+    @contextmanager
+    def cursor(self):
+        """
+        Fornece um cursor próprio da conexão compartilhada, com medição do tempo das consultas,
+        fechado ao final do bloco `with`.
+        """
+        cursor = self.connection.cursor()
+        try:
+            yield InstrumentedCursor(cursor, self)
+        finally:
+            cursor.close()
+
+    def acquire(self):
+        with self._lock:
+            self._active_queries += 1
+
+    def release(self):
+        with self._lock:
+            self._active_queries -= 1
+            close = self._retired and self._active_queries == 0
+        if close:
+            self._close()
+
+    def retire(self):
+        with self._lock:
+            self._retired = True
+            close = self._active_queries == 0
+        if close:
+            self._close()
+
+    def _close(self):
+        self.connection.close()
+
+class ResponseCache:
+    """
+    Cache LRU com tempo de vida das respostas JSON já serializadas, indexado por endpoint e parâmetros.
+
+    As entradas pertencem a uma geração do banco servido. Ao trocar a versão do banco, `invalidate`
+    incrementa a geração e esvazia o cache sob o mesmo lock, de forma que nenhuma resposta calculada na
+    versão anterior é servida ou gravada depois da troca.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        """
+        Busca uma resposta no cache.
+
+        Retorno:
+            tuple: Geração atual do cache e entrada (ETag e corpo da resposta), ou None se não houver entrada válida.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._generation, entry[1:]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return self._generation, None
+
+    def put(self, key: tuple, generation: int, body: bytes):
+        """
+        Grava uma resposta calculada na geração informada. Se o banco foi trocado durante o cálculo,
+        a resposta é devolvida sem ser gravada.
+
+        Retorno:
+            tuple: ETag e corpo da resposta.
+        """
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        with self._lock:
+            if generation == self._generation and self.max_entries > 0:
+                self._entries[key] = (time.monotonic() + self.ttl, etag, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return etag, body
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"entradas": len(self._entries), "max_entradas": self.max_entries, "ttl_segundos": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "pid": os.getpid(),
+                    "taxa_acerto": round(self.hits / requests, 4) if requests else None}
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+def update_snapshot_metrics():
+    """
+    Atualiza os gauges da versão servida por este worker. No modo multiprocesso os valores são lidos
+    dos arquivos de métricas e não de funções, por isso a atualização é feita a cada troca de versão,
+    a cada leitura da geração publicada e a cada leitura de `/metrics`.
+    """
+    snapshot = _snapshot
+    SNAPSHOT_AGE.set(time.time() - snapshot.loaded_at if snapshot else 0)
+    SNAPSHOT_ROWS.set((snapshot.total_rows or 0) if snapshot else 0)
+    SNAPSHOT_GENERATION.set(snapshot.generation if snapshot else 0)
+
+_refresh_lock = threading.Lock()
+_generation_lock = threading.Lock()
+
+def swap_snapshot(path: str | None, version: str = None, manifest: dict = None,
+                  connection: duckdb.DuckDBPyConnection = None, generation: int = 0):
+    """
+    Abre a versão do banco no caminho informado (ou usa a conexão já aberta) e a torna a versão servida
+    pela API, de forma atômica. Novas consultas passam a usar a nova versão e as consultas em andamento
+    terminam na versão anterior.
+    """
+    global _snapshot
+    new_snapshot = DatabaseSnapshot(path, version, manifest, connection, generation)
+    with _snapshot_lock:
+        old_snapshot, _snapshot = _snapshot, new_snapshot
+    update_snapshot_metrics()
+    response_cache.invalidate()
+    if old_snapshot:
+        old_snapshot.retire()
+
+@contextmanager
+def database_snapshot():
+    """
+    Fornece a versão do banco servida no momento, mantendo essa versão aberta até o fim do bloco `with`.
+    """
+    with _snapshot_lock:
+        snapshot = _snapshot
+        snapshot.acquire()
+    try:
+        yield snapshot
+    finally:
+        snapshot.release()
+
+@contextmanager
+def database_cursor():
+    """
+    Fornece um cursor da versão do banco servida no momento, mantendo essa versão aberta até o fim do bloco `with`.
+    """
+    with database_snapshot() as snapshot, snapshot.cursor() as cursor:
+        yield cursor
+
+@contextmanager
+def refresh_lock():
+    """
+    Garante que uma única atualização dos dados rode por vez entre todos os workers do host:
+    lock de thread dentro do processo e lock de arquivo (fcntl) em DIRETORIO_DADOS entre processos.
+    """
+    with _refresh_lock, open(REFRESH_LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def write_json_atomic(path: str, content: dict):
+    """
+    Grava um arquivo JSON de forma atômica (arquivo temporário + os.replace): leitores concorrentes
+    veem o conteúdo anterior ou o novo, nunca um arquivo incompleto.
+    """
+    temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(content, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+def read_generation():
+    """
+    Lê a geração dos dados publicada em DIRETORIO_DADOS. Retorna None se nenhuma geração foi publicada.
+    """
+    try:
+        with open(GENERATION_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def remove_old_versions(keep: set):
+    """
+    Apaga os arquivos de versões do banco que não estão em `keep` (geração publicada e anterior).
+    Workers que ainda servem uma versão apagada continuam lendo o arquivo já aberto até trocarem
+    de geração. Deve ser chamada com o lock de atualização.
+    """
+    for old_file in glob.glob(os.path.join(DATA_DIRECTORY, f"{DB_FILE_PREFIX}_*.duckdb")):
+        if os.path.basename(old_file) not in keep:
+            os.remove(old_file)
+
+def publish_generation(path: str | None, version: str, manifest: dict | None):
+    """
+    Publica uma nova versão dos dados para todos os workers do host, incrementando o contador de geração
+    gravado em DIRETORIO_DADOS. Deve ser chamada com o lock de atualização.
+
+    Parâmetros:
+        path (str): Arquivo da nova versão do banco, ou None no modo s3.
+        version (str): Versão dos dados.
+        manifest (dict): Manifesto do snapshot da camada gold, se houver.
+
+    Retorno:
+        dict: Geração publicada.
+    """
+    previous = read_generation()
+    record = {
+        "geracao": (previous["geracao"] if previous else 0) + 1,
+        "arquivo": os.path.basename(path) if path else None,
+        "versao": version,
+        "manifesto": manifest,
+        "publicado_em": datetime.datetime.now(datetime.timezone.utc).isoformat()
+    }
+    write_json_atomic(GENERATION_FILE, record)
+    remove_old_versions({record["arquivo"], previous["arquivo"] if previous else None})
+    return record
+
+def adopt_generation(record: dict):
+    """
+    Passa a servir a geração publicada, se for mais nova que a servida por este worker.
+
+    Retorno:
+        bool: Se a versão servida foi trocada.
+    """
+    with _generation_lock:
+        if _snapshot is not None and _snapshot.generation >= record["geracao"]:
+            return False
+        if record["arquivo"]:
+            swap_snapshot(os.path.join(DATA_DIRECTORY, record["arquivo"]), record["versao"], record["manifesto"],
+                          generation=record["geracao"])
+        else:
+            swap_snapshot(None, record["versao"], record["manifesto"], create_s3_connection(record["manifesto"]),
+                          generation=record["geracao"])
+    logger.info(f"Worker {os.getpid()} servindo a geração {record['geracao']} (versão {record['versao']})")
+    return True
+
+def sync_generation():
+    """
+    Passa a servir a geração publicada mais recente, se houver uma mais nova que a servida.
+    """
+    record = read_generation()
+    if record is not None:
+        adopt_generation(record)
+
+def watch_generation(stop: threading.Event):
+    """
+    Lê periodicamente a geração publicada, para que cada worker troque para a versão carregada por
+    qualquer outro worker do host sem interromper as consultas em andamento.
+    """
+    while not stop.wait(GENERATION_POLL_INTERVAL):
+        update_snapshot_metrics()
+        try:
+            sync_generation()
+        except Exception:
+            #Geração removida antes de ser aberta (worker atrasado): a leitura seguinte pega a mais recente
+            logger.exception("Erro ao carregar a geração publicada dos dados")
+
+async def cached_response(request: Request, endpoint: str, params: dict, build):
+    """
+    Serve a resposta de um endpoint a partir do cache de respostas, calculando-a com `build` em caso de miss.
+    Respostas de erro (HTTPException) não são gravadas no cache.
+
+    A resposta leva o cabeçalho ETag. Se a requisição enviar If-None-Match com o mesmo ETag,
+    retorna 304 sem corpo, permitindo que clientes e CDNs revalidem sem baixar os dados novamente.
+
+    Parâmetros:
+        request (Request): Requisição recebida, para leitura do If-None-Match.
+        endpoint (str): Nome do endpoint, parte da chave do cache.
+        params (dict): Parâmetros que definem a resposta, parte da chave do cache.
+        build (callable): Corrotina sem argumentos que retorna o corpo da resposta (dict).
+
+    Retorno:
+        Response: Resposta JSON com ETag ou 304.
+    """
+    key = (endpoint, tuple(sorted(params.items())))
+    generation, entry = response_cache.get(key)
+    if entry is None:
+        body = json.dumps(jsonable_encoder(await build()), ensure_ascii=False).encode()
+        entry = response_cache.put(key, generation, body)
+    etag, body = entry
+
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def encode_cursor(last_id: int):
+    """
+    Codifica o último id de uma página em um cursor opaco para a próxima página.
+    """
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Decodifica um cursor gerado por `encode_cursor`, retornando o último id da página anterior.
+    """
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=422, detail="Cursor inválido")
+
+def new_db_path():
+    """
+    Retorna um caminho inédito para uma nova versão do banco local.
+    Cada versão tem arquivo próprio para que a versão anterior continue íntegra enquanto estiver em uso.
     """
-    temp_file = "local.duckdb.tmp"
+    return os.path.join(DATA_DIRECTORY, f"{DB_FILE_PREFIX}_{time.time_ns()}.duckdb")
 
-    s3 = boto3.client('s3', 
+def create_s3_client():
+    """
+    Cria um cliente S3 com as credenciais da aplicação.
+    """
+    return boto3.client('s3', 
                   region_name=AWS_REGION, 
+                  endpoint_url=S3_ENDPOINT_URL,
                   aws_access_key_id=AWS_ACCESS_KEY_ID,
                   aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
-    s3.download_file(BUCKET_NAME, "terceirizados/gold/terceirizados_gold.duckdb", temp_file)
 
-    os.replace(temp_file, DB_FILE)
+def fetch_snapshot_manifest(s3):
+    """
+    Lê o manifesto do snapshot versionado da camada gold publicado pelo pipeline.
+    Retorna None se o manifesto não existir no bucket.
+    """
+    try:
+        return json.loads(s3.get_object(Bucket=BUCKET_NAME, Key=GOLD_SNAPSHOT_MANIFEST_KEY)["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        return None
+
+def load_data():
+    """
+    Carrega os dados do banco de dados S3 para construir o banco DuckDB local.
+    Cria arquivo temporário para que a atualização seja atômica. Se a versão no S3 já é a servida,
+    nada é baixado.
+
+    Retorno:
+        dict: Modo de atualização e versão carregada (ETag do arquivo no S3).
+    """
+    s3 = create_s3_client()
+    key = "terceirizados/gold/terceirizados_gold.duckdb"
+    version = s3.head_object(Bucket=BUCKET_NAME, Key=key)["ETag"].strip('"')
+    if _snapshot is not None and _snapshot.version == version:
+        return {"modo": "completo", "versao": version}
+
+    db_file = new_db_path()
+    temp_file = f"{db_file}.tmp"
+    try:
+        s3.download_file(BUCKET_NAME, key, temp_file)
+        os.replace(temp_file, db_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    publish_snapshot(db_file, version)
+    return {"modo": "completo", "versao": version}
+
+def validate_snapshot_db(db_file: str, manifest: dict | None):
+    """
+    Confere uma nova versão do banco antes de publicá-la: a tabela servida precisa existir e, com
+    manifesto, cada tabela precisa ter a quantidade de linhas informada nele.
+
+    Exceções:
+        ValueError: Quantidade de linhas diferente da informada no manifesto.
+        duckdb.Error: Banco ilegível ou tabela ausente.
+    """
+    with duckdb.connect(db_file, read_only=True) as con:
+        con.execute(f"SELECT COUNT(*) FROM {SERVED_TABLE}").fetchone()
+        if manifest is None:
+            return
+        expected = {table: entry["linhas"] for table, entry in manifest["tabelas"].items()}
+        expected[manifest["tabela_principal"]] = sum(partition["linhas"] for partition in manifest["particoes"].values())
+        for table, rows in expected.items():
+            actual = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if actual != rows:
+                raise ValueError(f"Tabela {table} com {actual} registros, esperados {rows} pelo manifesto")
+
+def publish_snapshot(db_file: str, version: str, manifest: dict = None):
+    """
+    Valida uma nova versão do banco local, publica-a como nova geração para todos os workers do host
+    e passa a servi-la neste worker. Uma versão inválida é apagada sem ser publicada.
+    Deve ser chamada com o lock de atualização.
+    """
+    try:
+        validate_snapshot_db(db_file, manifest)
+    except Exception:
+        os.remove(db_file)
+        raise
+    adopt_generation(publish_generation(db_file, version, manifest))
+
+def build_snapshot_db(db_file: str, manifest: dict, base_manifest: dict | None, files: dict):
+    """
+    Aplica as diferenças entre o snapshot da camada gold já servido (base_manifest) e o novo (manifest)
+    em um arquivo DuckDB, em uma única transação.
+
+    Sem base, cria a tabela gold a partir de todas as partições e recria os índices listados no manifesto.
+    Com base, o arquivo já é uma cópia da versão servida: apaga os meses alterados ou removidos e insere
+    as novas partições desses meses. Tabelas de estatísticas alteradas são substituídas, com os índices
+    listados no manifesto.
+
+    Parâmetros:
+        db_file (str): Arquivo DuckDB a ser atualizado.
+        manifest (dict): Manifesto do novo snapshot.
+        base_manifest (dict): Manifesto da versão servida, ou None para construir do zero.
+        files (dict): Caminho local baixado de cada chave do S3 alterada.
+    """
+    main_table = manifest["tabela_principal"]
+    base_partitions = base_manifest["particoes"] if base_manifest else {}
+    base_tables = base_manifest["tabelas"] if base_manifest else {}
+    changed_months = [month for month, partition in manifest["particoes"].items()
+                      if base_partitions.get(month, {}).get("checksum") != partition["checksum"]]
+    removed_months = [month for month in base_partitions if month not in manifest["particoes"]]
+    changed_files = [files[manifest["particoes"][month]["chave"]] for month in changed_months]
+
+    with duckdb.connect(db_file) as con:
+        con.execute("BEGIN TRANSACTION")
+        if base_manifest is None:
+            if changed_files:
+                con.execute(f"CREATE TABLE {main_table} AS SELECT * FROM read_parquet({changed_files})")
+                for index_sql in manifest["indices"]:
+                    con.execute(index_sql)
+        else:
+            for month in changed_months + removed_months:
+                con.execute(f"DELETE FROM {main_table} WHERE mes_referencia = ?", [datetime.date.fromisoformat(month)])
+            if changed_files:
+                con.execute(f"INSERT INTO {main_table} SELECT * FROM read_parquet({changed_files})")
+        for table, entry in manifest["tabelas"].items():
+            if base_tables.get(table, {}).get("checksum") != entry["checksum"]:
+                con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM read_parquet('{files[entry['chave']]}')")
+                for index_sql in manifest.get("indices_tabelas", {}).get(table, []):
+                    con.execute(index_sql)
+        con.execute("COMMIT")
+        con.execute("CHECKPOINT")
+    return len(changed_months) + len(removed_months)
+
+def load_data_delta():
+    """
+    Atualiza o banco DuckDB local a partir do snapshot versionado da camada gold no S3, baixando apenas
+    as partições mensais e tabelas de estatísticas cujo checksum mudou desde a versão servida.
+
+    A nova versão é construída sobre uma cópia local da versão servida, de forma que o tráfego e o tempo
+    de download acompanham o volume de dados alterados. Se o manifesto do snapshot não existir no bucket,
+    faz o carregamento completo do arquivo .duckdb.
+
+    Retorno:
+        dict: Modo de atualização, versão servida e quantidade de partições e tabelas baixadas.
+    """
+    s3 = create_s3_client()
+    manifest = fetch_snapshot_manifest(s3)
+    if manifest is None:
+        return load_data()
+
+    if _snapshot is None:
+        return load_data_full_snapshot(s3, manifest)
+    with database_snapshot() as current:
+        base_manifest = current.manifest
+        if base_manifest and base_manifest["versao"] == manifest["versao"]:
+            return {"modo": "delta", "versao": manifest["versao"], "particoes_atualizadas": 0, "objetos_baixados": 0}
+
+        entries = [*manifest["particoes"].values(), *manifest["tabelas"].values()]
+        base_checksums = set()
+        if base_manifest:
+            base_checksums = {entry["checksum"] for entry in [*base_manifest["particoes"].values(), *base_manifest["tabelas"].values()]}
+        to_download = [entry["chave"] for entry in entries if entry["checksum"] not in base_checksums]
+
+        temp_dir = tempfile.mkdtemp(prefix="gold_delta_", dir=DATA_DIRECTORY)
+        db_file = new_db_path()
+        try:
+            files = {key: os.path.join(temp_dir, f"{i}.parquet") for i, key in enumerate(to_download)}
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda key: s3.download_file(BUCKET_NAME, key, files[key]), to_download))
+
+            if base_manifest:
+                shutil.copyfile(current.path, db_file)
+            try:
+                changed_partitions = build_snapshot_db(db_file, manifest, base_manifest, files)
+            except duckdb.Error:
+                #Falha ao aplicar as diferenças (ex: mudança de schema na camada gold): reconstrói do zero
+                if not base_manifest:
+                    raise
+                os.remove(db_file)
+                return load_data_full_snapshot(s3, manifest)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    publish_snapshot(db_file, manifest["versao"], manifest)
+    return {"modo": "delta", "versao": manifest["versao"], "particoes_atualizadas": changed_partitions,
+            "objetos_baixados": len(to_download)}
+
+def load_data_full_snapshot(s3, manifest: dict):
+    """
+    Constrói do zero um banco DuckDB local com todas as partições e tabelas do snapshot da camada gold.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="gold_delta_", dir=DATA_DIRECTORY)
+    db_file = new_db_path()
+    try:
+        keys = [entry["chave"] for entry in [*manifest["particoes"].values(), *manifest["tabelas"].values()]]
+        files = {key: os.path.join(temp_dir, f"{i}.parquet") for i, key in enumerate(keys)}
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda key: s3.download_file(BUCKET_NAME, key, files[key]), keys))
+        changed_partitions = build_snapshot_db(db_file, manifest, None, files)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    publish_snapshot(db_file, manifest["versao"], manifest)
+    return {"modo": "delta", "versao": manifest["versao"], "particoes_atualizadas": changed_partitions,
+            "objetos_baixados": len(keys)}
+
+def s3_url(key: str):
+    """
+    Monta a URL s3:// de uma chave do bucket, no formato lido pelo httpfs do DuckDB.
+    """
+    return f"s3://{BUCKET_NAME}/{key}"
+
+def create_s3_connection(manifest: dict):
+    """
+    Cria uma conexão DuckDB em memória que consulta os arquivos parquet do snapshot da camada gold
+    direto no S3 via httpfs, sem baixar o banco.
+
+    A tabela gold e as tabelas de estatísticas são expostas como views sobre os arquivos listados no
+    manifesto, com os mesmos nomes usados no modo local. Os blocos lidos do S3 ficam apenas em memória,
+    no cache de arquivos externos do DuckDB, limitado por `LIMITE_MEMORIA_S3` e descartado por LRU, e os
+    metadados dos arquivos parquet e das requisições HTTP também são mantidos em cache. Não há cache
+    em disco: `DIRETORIO_SPILL_S3` e `LIMITE_DISCO_SPILL_S3` valem só para o spill das consultas.
+
+    Parâmetros:
+        manifest (dict): Manifesto do snapshot da camada gold.
+
+    Retorno:
+        duckdb.DuckDBPyConnection: Conexão com as views da camada gold.
+    """
+    os.makedirs(S3_SPILL_DIRECTORY, exist_ok=True)
+    con = duckdb.connect(":memory:")
+    con.execute("INSTALL httpfs; LOAD httpfs;")
+    con.execute(f"""
+        SET s3_region='{AWS_REGION}';
+        SET s3_access_key_id='{AWS_ACCESS_KEY_ID}';
+        SET s3_secret_access_key='{AWS_SECRET_ACCESS_KEY}';
+        SET memory_limit='{S3_MEMORY_LIMIT}';
+        SET temp_directory='{S3_SPILL_DIRECTORY}';
+        SET max_temp_directory_size='{S3_SPILL_DISK_LIMIT}';
+        SET enable_external_file_cache=true;
+        SET parquet_metadata_cache=true;
+        SET enable_http_metadata_cache=true;
+        """)
+    if S3_ENDPOINT_URL:
+        endpoint = urllib.parse.urlparse(S3_ENDPOINT_URL)
+        con.execute(f"""
+            SET s3_endpoint='{endpoint.netloc}';
+            SET s3_url_style='path';
+            SET s3_use_ssl={str(endpoint.scheme == "https").lower()};
+            """)
+
+    partitions = [s3_url(partition["chave"]) for _, partition in sorted(manifest["particoes"].items())]
+    if partitions:
+        con.execute(f"CREATE VIEW {manifest['tabela_principal']} AS SELECT * FROM read_parquet({partitions})")
+    for table, entry in manifest["tabelas"].items():
+        con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{s3_url(entry['chave'])}')")
+    return con
+
+def load_data_s3():
+    """
+    Passa a servir a versão mais recente do snapshot da camada gold direto do S3 (modo s3).
+    Só lê o manifesto: nenhum arquivo de dados é baixado, e a inicialização não depende do tamanho da base.
+
+    Retorno:
+        dict: Modo de serviço e versão servida.
+    """
+    s3 = create_s3_client()
+    manifest = fetch_snapshot_manifest(s3)
+    if manifest is None:
+        raise FileNotFoundError(f"Manifesto {GOLD_SNAPSHOT_MANIFEST_KEY} não encontrado no bucket")
+    if _snapshot is None or _snapshot.version != manifest["versao"]:
+        adopt_generation(publish_generation(None, manifest["versao"], manifest))
+    return {"modo": "s3", "versao": manifest["versao"]}
+
+def refresh():
+    """
+    Atualiza os dados servidos no modo configurado em MODO_SERVICO (local ou s3) e, no modo local,
+    em MODO_ATUALIZACAO (delta ou completo). O tempo de cada atualização é registrado nas métricas.
+
+    Roda com o lock de atualização, a partir da geração publicada mais recente: se outro worker já
+    carregou a versão atual do S3, nada é baixado novamente.
+    """
+    mode = "s3" if SERVING_MODE == "s3" else REFRESH_MODE
+    start = time.perf_counter()
+    result = "erro"
+    try:
+        with refresh_lock():
+            sync_generation()
+            if SERVING_MODE == "s3":
+                response = load_data_s3()
+            elif REFRESH_MODE == "completo":
+                response = load_data()
+            else:
+                response = load_data_delta()
+        result = "sucesso"
+        return {**response, "geracao": _snapshot.generation}
+    finally:
+        REFRESH_DURATION.labels(mode, result).observe(time.perf_counter() - start)
 
 def create_empty_db():
     """
-    Cria um banco de dados vazio. 
-    Função chamada como fallback caso o carregamento do dados falhe no startup.
+    Serve um banco de dados vazio, em memória e apenas neste worker.
+    Função chamada como fallback caso o carregamento do dados falhe no startup e nenhuma geração
+    tenha sido publicada por outro worker.
+    """
+    if _snapshot is None:
+        swap_snapshot(None, connection=duckdb.connect(":memory:"))
+
+def new_refresh_job():
+    """
+    Cria o registro de um job de atualização em DIRETORIO_DADOS, visível para todos os workers do host,
+    e apaga os registros mais antigos que RETENCAO_JOBS_SEGUNDOS.
     """
-    con=duckdb.connect(DB_FILE)
-    con.close()
+    now = time.time()
+    for job_file in glob.glob(os.path.join(JOBS_DIRECTORY, "*.json")):
+        try:
+            if now - os.path.getmtime(job_file) > JOB_RETENTION:
+                os.remove(job_file)
+        except FileNotFoundError:
+            pass
+    job = {"job_id": uuid.uuid4().hex, "status": "pendente", "worker": os.getpid(),
+           "criado_em": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+           "iniciado_em": None, "concluido_em": None, "resultado": None, "erro": None}
+    write_json_atomic(os.path.join(JOBS_DIRECTORY, f"{job['job_id']}.json"), job)
+    return job
+
+def run_refresh_job(job: dict):
+    """
+    Executa um job de atualização no pool de atualização deste worker, gravando o status a cada etapa.
+    """
+    global _queued_job
+    with _queued_job_lock:
+        if _queued_job is job:
+            _queued_job = None
+    job_file = os.path.join(JOBS_DIRECTORY, f"{job['job_id']}.json")
+    job.update(status="executando", iniciado_em=datetime.datetime.now(datetime.timezone.utc).isoformat())
+    write_json_atomic(job_file, job)
+    try:
+        job.update(status="concluido", resultado=refresh())
+    except Exception as e:
+        logger.exception(f"Erro no job de atualização {job['job_id']}")
+        job.update(status="erro", erro=str(e))
+    job["concluido_em"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    write_json_atomic(job_file, job)
+
+#Jobs de atualização rodam um por vez em cada worker; um job ainda pendente é reaproveitado por novas requisições
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="atualizacao")
+_queued_job = None
+_queued_job_lock = threading.Lock()
+_stop_watching = threading.Event()
 
 @app.on_event("startup")
 async def startup_event():
     """
     Evento executado na inicialização da aplicação.
 
-    Tenta sincronizar o banco local com o arquivo armazenado no S3.
-    Em caso de falha, cria banco vazio como fallback.
+    Passa a servir a geração já publicada por outro worker do host, se houver, e tenta sincronizar
+    o banco local com o arquivo armazenado no S3. Em caso de falha sem geração publicada, cria banco
+    vazio como fallback. Em seguida, inicia a leitura periódica da geração publicada.
     """
+    os.makedirs(JOBS_DIRECTORY, exist_ok=True)
     try:
-        await asyncio.to_thread(load_data)
+        await run_in_thread(refresh)
     except Exception:
-        await asyncio.to_thread(create_empty_db)
+        logger.exception("Erro ao carregar os dados na inicialização")
+        await run_in_thread(create_empty_db)
+    threading.Thread(target=watch_generation, args=(_stop_watching,), daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    _stop_watching.set()
+    _refresh_executor.shutdown(wait=False, cancel_futures=True)
+    if PROMETHEUS_MULTIPROC_DIR:
+        #Remove os gauges deste worker das somas dos workers vivos
+        multiprocess.mark_process_dead(os.getpid())
 
 @app.post("/admin/refresh", 
+          status_code=202,
           summary="Atualizar os dados",
           description="""
-          Atualiza os dados da API
+          Inicia a atualização dos dados da API em segundo plano e retorna imediatamente o id do job.
+          No modo delta, baixa apenas as partições da camada gold alteradas desde a versão servida.
+          O andamento e a versão carregada são consultados em `/admin/refresh/{job_id}`.
           """,
           responses={
-            500: {
-                  "description": "Erro ao baixar o arquivo do S3 ou substituir o banco local",
+            202: {
+                  "description": "Atualização iniciada (ou já pendente neste worker)",
                   "content": {
                       "application/json": {
                           "example": {
-                              "detail": "Erro ao atualizar base de dados"
+                              "job_id": "3f2b0c6e9d8a4f1b8c7e6d5a4b3c2d1e",
+                              "status": "pendente",
+                              "url": "/admin/refresh/3f2b0c6e9d8a4f1b8c7e6d5a4b3c2d1e"
                           }
                       }
                   }
@@ -72,18 +1003,67 @@ async def startup_event():
       )
 async def refresh_data():
     """
-    Carrega novamente os dados armazendo na AWS S3 para atualizar o banco DuckDB local.
-    Cria arquivo temporário para que a atualização seja atômica.
-    Semelhante ao startup.
+    Agenda a carga dos dados armazenados na AWS S3 para atualizar o banco DuckDB local, sem bloquear
+    a requisição. A nova versão é baixada e validada em segundo plano e publicada como nova geração:
+    todos os workers do host passam a servi-la sem interromper as consultas em andamento.
+
+    Se já houver um job pendente neste worker, retorna esse job em vez de agendar outro.
+
+    Retorno:
+        dict: Id, status e URL de consulta do job.
     """
+    global _queued_job
+    with _queued_job_lock:
+        job = _queued_job
+        if job is None:
+            job = _queued_job = new_refresh_job()
+            _refresh_executor.submit(run_refresh_job, job)
+    return {"job_id": job["job_id"], "status": job["status"], "url": f"/admin/refresh/{job['job_id']}"}
+
+@app.get("/admin/refresh/{job_id}", 
+         summary="Status de uma atualização dos dados",
+         description="""
+         Retorna o status de um job de atualização (pendente, executando, concluido ou erro), a versão
+         e a geração dos dados carregadas ao concluir e a mensagem de erro em caso de falha.
+         Pode ser consultado em qualquer worker do host.
+         """,
+         responses={
+             404: {
+                 "description": "Job não encontrado",
+                 "content": {"application/json": {"example": {"detail": "Job não encontrado"}}}
+             }
+         })
+async def get_refresh_job(job_id: str = Path(..., pattern="^[0-9a-f]{32}$", description="Id do job retornado por POST /admin/refresh")):
     try:
-        await asyncio.to_thread(load_data)
-        return {"status": "dados carregados"}
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Erro ao atualizar base de dados"
-        )
+        with open(os.path.join(JOBS_DIRECTORY, f"{job_id}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+@app.get("/metrics", 
+         summary="Métricas de desempenho (Prometheus)",
+         description="""
+         Métricas no formato de exposição do Prometheus: latência por rota, requisições em andamento,
+         fila do pool de threads, tempo das consultas DuckDB, consultas lentas, tempo de atualização
+         dos dados e idade da versão servida. Com `PROMETHEUS_MULTIPROC_DIR`, agrega todos os workers do container.
+         """)
+async def get_metrics():
+    update_snapshot_metrics()
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/admin/cache", 
+         summary="Estatísticas do cache de respostas",
+         description="""
+         Retorna a quantidade de entradas, o limite, o tempo de vida e os contadores de hits e misses do cache de respostas,
+         para ajustar `CACHE_RESPOSTAS_TAMANHO` e `CACHE_RESPOSTAS_TTL`.
+         O cache é mantido em memória por worker: os valores são os do worker que respondeu, identificado em `pid`.
+         """)
+async def get_cache_stats():
+    return response_cache.stats()
 
 @app.get("/", 
          summary="Redirecionar para essa documentação")
@@ -97,6 +1077,9 @@ async def redirect_to_docs():
 
             - Ordenação: crescente por `id_terc`
             - Máximo de 200 registros por página
+            - Paginação por número de página (`page`) ou por cursor (`cursor`). Para percorrer toda a base,
+              prefira o cursor: cada resposta traz `next_cursor`, que deve ser enviado na requisição seguinte.
+              O custo de cada página com cursor é constante, enquanto o de páginas distantes por número cresce.
             """,
             responses={
                 404: {
@@ -108,7 +1091,7 @@ async def redirect_to_docs():
                     }
                 },
                 422: {
-                    "description": "Erro de validação (ex: page_size maior que 200)",
+                    "description": "Erro de validação (ex: page_size maior que 200 ou cursor inválido)",
                 },
                 500: {
                     "description": "Erro interno ao acessar o banco de dados",
@@ -119,41 +1102,66 @@ async def redirect_to_docs():
                     }
                 }
             })
-async def get_terceirizados(page_size: int = Query(50, ge=1, le=200, description="Quantidade de registros por página (máx: 200)"), 
-                            page: int = Query(0, ge=0, description="Número da página (inicia em 0)")):
+async def get_terceirizados(request: Request,
+                            page_size: int = Query(50, ge=1, le=200, description="Quantidade de registros por página (máx: 200)"), 
+                            page: int = Query(0, ge=0, description="Número da página (inicia em 0). Ignorado quando `cursor` é informado"),
+                            cursor: str | None = Query(None, description="Cursor da próxima página, retornado em `next_cursor` pela página anterior")):
     """
     Retorna uma lista paginada dos funcionários terceirizados.
 
     Parâmetros:
         page_size (int): Número de registros retornados por página. Máximo permitido: 200.
         page (int): Número da página a ser retornada (começa em 0).
+        cursor (str): Cursor opaco com o último id da página anterior. Quando informado, a página é buscada
+            por intervalo de id em vez de OFFSET.
 
     Retorno:
         dict: Contém os seguintes campos:
             - total_rows (int): Total de registros na base de dados.
             - page_size (int): Quantidade de registros retornados nesta página.
-            - page (int): Número da página atual.
+            - page (int): Número da página atual. None na paginação por cursor.
             - total_pages (int): Total de páginas disponíveis.
+            - next_cursor (str): Cursor da próxima página. None na última página.
             - data (list): Lista de dicionários com os dados dos terceirizados.
 
     Exceções:
         HTTPException 404: Nenhum registro encontrado para os parâmetros informados.
-        HTTPException 422: Erro de validação (ex: page_size maior que 200).
+        HTTPException 422: Erro de validação (ex: page_size maior que 200 ou cursor inválido).
         HTTPException 500: Erro interno ao acessar o banco de dados.
     """
+    last_id = decode_cursor(cursor) if cursor is not None else None
+    params = {"page_size": page_size, "page": page} if last_id is None else {"page_size": page_size, "last_id": last_id}
+    return await cached_response(request, "terceirizados", params, lambda: list_terceirizados(page_size, page, last_id))
+
+async def list_terceirizados(page_size: int, page: int, last_id: int | None):
+    """
+    Consulta uma página da listagem de terceirizados, por número de página ou pelo último id da página anterior.
+    """
     def query():
         try:
-            with duckdb.connect(DB_FILE) as con:
-                total = con.sql("SELECT COUNT(*) FROM terceirizados_gold").fetchone()[0]
-                result = con.sql("""SELECT 
-                                    id_terceirizado, 
-                                    terceirizado_cpf,
-                                    orgao_superior_sigla,
-                                    empresa_cnpj
-                                    FROM terceirizados_gold
-                                    ORDER BY id_terceirizado ASC
-                                    LIMIT ? OFFSET ?""",
-                                    params=[page_size, page * page_size]).fetchall()
+            with database_snapshot() as snapshot, snapshot.cursor() as con:
+                total = snapshot.total_rows
+                if last_id is None:
+                    result = con.sql(f"""SELECT 
+                                        id_terceirizado, 
+                                        terceirizado_cpf,
+                                        orgao_superior_sigla,
+                                        empresa_cnpj
+                                        FROM {SERVED_TABLE}
+                                        ORDER BY id_terceirizado ASC
+                                        LIMIT ? OFFSET ?""",
+                                        params=[page_size, page * page_size]).fetchall()
+                else:
+                    result = con.sql(f"""SELECT 
+                                        id_terceirizado, 
+                                        terceirizado_cpf,
+                                        orgao_superior_sigla,
+                                        empresa_cnpj
+                                        FROM {SERVED_TABLE}
+                                        WHERE id_terceirizado > ?
+                                        ORDER BY id_terceirizado ASC
+                                        LIMIT ?""",
+                                        params=[last_id, page_size]).fetchall()
                 
                 columns = [
                     "id_terceirizado",
@@ -169,12 +1177,374 @@ async def get_terceirizados(page_size: int = Query(50, ge=1, le=200, description
                 
         return total, data
         
-    total, data = await asyncio.to_thread(query)
+    total, data = await run_in_thread(query)
     if not data:
         raise HTTPException(status_code=404, detail="Nenhum registro encontrado para os parâmetros informados")
+
+    next_cursor = None
+    if len(data) == page_size and data[-1]["id_terceirizado"] is not None:
+        next_cursor = encode_cursor(data[-1]["id_terceirizado"])
         
     return {"total_rows": total, "page_size": page_size, 
-            "page": page, "total_pages": (total+page_size-1)//page_size, "data": data}
+            "page": page if last_id is None else None, "total_pages": (total+page_size-1)//page_size,
+            "next_cursor": next_cursor, "data": data}
+
+@app.get("/terceirizados/search", 
+          summary="Buscar terceirizados por filtros",
+          description="""
+            Retorna lista paginada de terceirizados que atendem a todos os filtros informados.
+
+            - É obrigatório informar ao menos um filtro
+            - Filtros combináveis: `orgao_superior_sigla`, `empresa_cnpj`, `mes_carga`, `terceirizado_cpf` e `contrato_numero`
+            - Ordenação: crescente por `id_terceirizado`
+            - Paginação por cursor: cada resposta traz `next_cursor`, que deve ser enviado na requisição seguinte
+            - Máximo de 200 registros por página
+            """,
+            responses={
+                404: {
+                    "description": "Nenhum registro encontrado para os parâmetros informados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Nenhum registro encontrado para os parâmetros informados"}
+                        }
+                    }
+                },
+                422: {
+                    "description": "Erro de validação (ex: nenhum filtro informado ou cursor inválido)",
+                },
+                500: {
+                    "description": "Erro interno ao acessar o banco de dados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Erro interno ao acessar o banco de dados"}
+                        }
+                    }
+                }
+            })
+async def search_terceirizados(orgao_superior_sigla: str | None = Query(None, description="Sigla do órgão superior da unidade gestora"),
+                               empresa_cnpj: str | None = Query(None, description="CNPJ da empresa terceirizada"),
+                               mes_carga: datetime.date | None = Query(None, description="Mês da carga dos dados (YYYY-MM-01)"),
+                               terceirizado_cpf: str | None = Query(None, description="CPF do terceirizado"),
+                               contrato_numero: str | None = Query(None, description="Número do contrato com a empresa terceirizada"),
+                               page_size: int = Query(50, ge=1, le=200, description="Quantidade de registros por página (máx: 200)"),
+                               cursor: str | None = Query(None, description="Cursor da próxima página, retornado em `next_cursor` pela página anterior")):
+    """
+    Retorna uma lista paginada dos funcionários terceirizados que atendem aos filtros informados.
+    Os filtros são combinados com AND e respondidos com a ordenação física da tabela gold (zone maps
+    por mês e órgão superior), que evita ler os row groups fora dos filtros.
+
+    Parâmetros:
+        orgao_superior_sigla (str): Sigla do órgão superior da unidade gestora.
+        empresa_cnpj (str): CNPJ da empresa terceirizada.
+        mes_carga (date): Mês da carga dos dados.
+        terceirizado_cpf (str): CPF do terceirizado.
+        contrato_numero (str): Número do contrato com a empresa terceirizada.
+        page_size (int): Número de registros retornados por página. Máximo permitido: 200.
+        cursor (str): Cursor opaco com o último id da página anterior.
+
+    Retorno:
+        dict: Contém os seguintes campos:
+            - filters (dict): Filtros aplicados.
+            - page_size (int): Quantidade de registros retornados nesta página.
+            - next_cursor (str): Cursor da próxima página. None na última página.
+            - data (list): Lista de dicionários com os dados dos terceirizados.
+
+    Exceções:
+        HTTPException 404: Nenhum registro encontrado para os parâmetros informados.
+        HTTPException 422: Erro de validação (ex: nenhum filtro informado ou cursor inválido).
+        HTTPException 500: Erro interno ao acessar o banco de dados.
+    """
+    filters = {
+        "orgao_superior_sigla": orgao_superior_sigla,
+        "empresa_cnpj": empresa_cnpj,
+        "mes_carga": mes_carga,
+        "terceirizado_cpf": terceirizado_cpf,
+        "contrato_numero": contrato_numero
+    }
+    filters = {column: value for column, value in filters.items() if value is not None}
+    if not filters:
+        raise HTTPException(status_code=422, detail="Informe ao menos um filtro")
+    last_id = decode_cursor(cursor) if cursor is not None else None
+
+    conditions = [f"{column} = ?" for column in filters]
+    params = list(filters.values())
+    if last_id is not None:
+        conditions.append("id_terceirizado > ?")
+        params.append(last_id)
+    params.append(page_size)
+
+    def query():
+        try:
+            with database_cursor() as con:
+                result = con.sql(f"""SELECT 
+                                    id_terceirizado, 
+                                    terceirizado_cpf,
+                                    orgao_superior_sigla,
+                                    empresa_cnpj,
+                                    contrato_numero,
+                                    mes_carga
+                                    FROM {SERVED_TABLE}
+                                    WHERE {" AND ".join(conditions)}
+                                    ORDER BY id_terceirizado ASC
+                                    LIMIT ?""",
+                                    params=params).fetchall()
+                
+                columns = [
+                    "id_terceirizado",
+                    "terceirizado_cpf",
+                    "orgao_superior_sigla",
+                    "empresa_cnpj",
+                    "contrato_numero",
+                    "mes_carga"
+                ]
+                
+                data = [dict(zip(columns, row)) for row in result] if result else []
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Erro interno ao acessar o banco de dados")
+                
+        return data
+        
+    data = await run_in_thread(query)
+    if not data:
+        raise HTTPException(status_code=404, detail="Nenhum registro encontrado para os parâmetros informados")
+
+    next_cursor = None
+    if len(data) == page_size and data[-1]["id_terceirizado"] is not None:
+        next_cursor = encode_cursor(data[-1]["id_terceirizado"])
+
+    return {"filters": filters, "page_size": page_size, "next_cursor": next_cursor, "data": data}
+
+DETAIL_COLUMNS = [
+    "id_terceirizado",
+    "terceirizado_cpf",
+    "terceirizado_nome",
+    "terceirizado_categoria_profissional",
+    "terceirizado_escolaridade",
+    "terceirizado_salario",
+    "terceirizado_custo",
+    "jornada_horas",
+    "empresa_cnpj",
+    "empresa_razao_social",
+    "contrato_numero",
+    "orgao_superior_sigla",
+    "unidade_gestora_sigla",
+    "unidade_gestora_nome",
+    "unidade_gestora_codigo",
+    "orgao_sigla",
+    "orgao_nome",
+    "orgao_codigo_siafi",
+    "orgao_codigo_siape",
+    "unidade_prestacao_nome",
+    "mes_carga"
+]
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "ndjson": ("application/x-ndjson", "ndjson")
+}
+
+class ChunkSink(io.RawIOBase):
+    """
+    Destino de escrita em memória para os writers do pyarrow, esvaziado a cada lote enviado ao cliente.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def ndjson_lines(column: pa.Array):
+    """
+    Monta as linhas NDJSON de um lote direto nos buffers Arrow: o compute do pyarrow acrescenta a quebra
+    de linha a cada JSON e o buffer de dados do resultado já é o trecho do arquivo, sem uma str Python por linha.
+
+    Parâmetros:
+        column (Array): Coluna de texto com um objeto JSON por linha.
+
+    Retorno:
+        bytes: Linhas do lote terminadas por quebra de linha.
+    """
+    lines = pc.binary_join_element_wise(column, "\n", "")
+    size = pc.sum(pc.binary_length(lines)).as_py() or 0
+    return lines.buffers()[2].slice(0, size).to_pybytes()
+
+def stream_export(stack: ExitStack, reader: pa.RecordBatchReader, formato: str):
+    """
+    Gera os bytes da exportação lote a lote a partir dos record batches Arrow do DuckDB, sem criar
+    objetos Python por linha. A versão do banco fica aberta até o fim da transferência.
+
+    Parâmetros:
+        stack (ExitStack): Contextos da versão do banco e do cursor, fechados ao final.
+        reader (RecordBatchReader): Leitor dos lotes do resultado da consulta.
+        formato (str): arrow (IPC stream), parquet ou ndjson.
+    """
+    with stack:
+        sink = ChunkSink()
+        if formato == "ndjson":
+            for batch in reader:
+                if batch.num_rows:
+                    yield ndjson_lines(batch.column(0))
+            return
+        if formato == "arrow":
+            writer = pa.ipc.new_stream(sink, reader.schema)
+        else:
+            writer = pq.ParquetWriter(sink, reader.schema, compression="zstd")
+        with writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
+
+@app.get("/terceirizados/export", 
+          summary="Exportar terceirizados em lote",
+          description="""
+            Exporta todos os terceirizados que atendem aos filtros informados em uma única resposta, com todas as colunas.
+
+            - Formatos: `arrow` (Arrow IPC stream), `parquet` ou `ndjson` (um objeto JSON por linha)
+            - Filtros opcionais: `orgao_superior_sigla`, `empresa_cnpj` e `mes_carga`. Sem filtros, exporta a base inteira
+            - A resposta é enviada em partes (chunked) à medida que é lida do banco, com uso de memória constante
+            - Ordem: física da tabela gold (mês de referência e órgão superior)
+            """,
+            responses={
+                422: {
+                    "description": "Erro de validação (ex: formato inexistente)",
+                },
+                500: {
+                    "description": "Erro interno ao acessar o banco de dados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Erro interno ao acessar o banco de dados"}
+                        }
+                    }
+                }
+            })
+async def export_terceirizados(formato: Literal["arrow", "parquet", "ndjson"] = Query("parquet", description="Formato da exportação"),
+                               orgao_superior_sigla: str | None = Query(None, description="Sigla do órgão superior da unidade gestora"),
+                               empresa_cnpj: str | None = Query(None, description="CNPJ da empresa terceirizada"),
+                               mes_carga: datetime.date | None = Query(None, description="Mês da carga dos dados (YYYY-MM-01)")):
+    """
+    Exporta os terceirizados em formato colunar ou NDJSON, transmitindo os record batches Arrow do DuckDB
+    direto para a resposta, sem montar dicionários Python.
+
+    Parâmetros:
+        formato (str): arrow, parquet ou ndjson.
+        orgao_superior_sigla (str): Sigla do órgão superior da unidade gestora.
+        empresa_cnpj (str): CNPJ da empresa terceirizada.
+        mes_carga (date): Mês da carga dos dados.
+
+    Retorno:
+        StreamingResponse: Arquivo no formato solicitado, enviado em partes.
+
+    Exceções:
+        HTTPException 422: Erro de validação (ex: formato inexistente).
+        HTTPException 500: Erro interno ao acessar o banco de dados.
+    """
+    filters = {
+        "orgao_superior_sigla": orgao_superior_sigla,
+        "empresa_cnpj": empresa_cnpj,
+        "mes_carga": mes_carga
+    }
+    filters = {column: value for column, value in filters.items() if value is not None}
+    where = f"WHERE {' AND '.join(f'{column} = ?' for column in filters)}" if filters else ""
+    query = f"SELECT {', '.join(DETAIL_COLUMNS)} FROM {SERVED_TABLE} {where}"
+    if formato == "ndjson":
+        query = f"SELECT to_json(t)::VARCHAR FROM ({query}) t"
+
+    def open_reader():
+        stack = ExitStack()
+        try:
+            snapshot = stack.enter_context(database_snapshot())
+            con = stack.enter_context(snapshot.cursor())
+            reader = con.execute(query, list(filters.values())).fetch_record_batch(EXPORT_BATCH_ROWS)
+        except Exception as e:
+            stack.close()
+            raise HTTPException(status_code=500, detail="Erro interno ao acessar o banco de dados")
+        return stack, reader
+
+    stack, reader = await run_in_thread(open_reader)
+    media_type, extension = EXPORT_FORMATS[formato]
+    return StreamingResponse(stream_export(stack, reader, formato), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="terceirizados.{extension}"'})
+
+class TerceirizadosBatchRequest(BaseModel):
+    ids: list[int] = Field(
+        min_length=1,
+        max_length=BATCH_MAX_IDS,
+        title="IDs dos terceirizados",
+        description=f"Lista de IDs dos terceirizados a serem consultados (máx: {BATCH_MAX_IDS})"
+    )
+
+@app.post("/terceirizados/batch", 
+          summary="Detalhes de vários terceirizados",
+          description=f"""
+            Retorna todos os dados dos terceirizados com os ids informados, em uma única consulta.
+
+            - Máximo de {BATCH_MAX_IDS} ids por requisição
+            - Mesmos campos de `/terceirizados/{{id}}`
+            - Ordenação: crescente por `id_terceirizado`
+            - Ids sem registro são listados em `nao_encontrados`
+            """,
+            responses={
+                422: {
+                    "description": "Erro de validação (ex: lista vazia ou com mais ids que o permitido)",
+                },
+                500: {
+                    "description": "Erro interno ao acessar o banco de dados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Erro interno ao acessar o banco de dados"}
+                        }
+                    }
+                }
+            })
+async def get_terceirizados_batch(body: TerceirizadosBatchRequest):
+    """
+    Retorna todos os dados disponíveis para uma lista de terceirizados.
+    Os ids são enviados ao DuckDB como uma única lista e resolvidos em uma consulta vetorizada,
+    substituindo uma requisição a `/terceirizados/{id}` por id.
+
+    Parâmetros:
+        body (TerceirizadosBatchRequest): Corpo da requisição com a lista de ids.
+
+    Retorno:
+        dict: Contém os seguintes campos:
+            - data (list): Lista de dicionários com todos os campos de cada terceirizado encontrado.
+            - nao_encontrados (list): Ids informados sem registro na base.
+
+    Exceções:
+        HTTPException 422: Erro de validação (ex: lista vazia ou com mais ids que o permitido).
+        HTTPException 500: Erro interno ao acessar o banco de dados.
+    """
+    ids = sorted(set(body.ids))
+
+    def query():
+        try:
+            with database_cursor() as con:
+                result = con.sql(f"""SELECT {", ".join(DETAIL_COLUMNS)}
+                                    FROM {SERVED_TABLE}
+                                    WHERE id_terceirizado IN (SELECT UNNEST(?::BIGINT[]))
+                                    ORDER BY id_terceirizado ASC
+                                    """,
+                                    params=[ids]).fetchall()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Erro interno ao acessar o banco de dados")
+
+        return [dict(zip(DETAIL_COLUMNS, row)) for row in result]
+
+    data = await run_in_thread(query)
+    found = {row["id_terceirizado"] for row in data}
+    return {"data": data, "nao_encontrados": [id for id in ids if id not in found]}
 
 @app.get("/terceirizados/{id}", 
           summary="Detalhes do terceirizado",
@@ -201,7 +1571,7 @@ async def get_terceirizados(page_size: int = Query(50, ge=1, le=200, description
                 }
             }
         )
-async def get_terceirizados_id(id: int = Path(..., description="ID do terceirizado a ser consultado")):
+async def get_terceirizados_id(request: Request, id: int = Path(..., description="ID do terceirizado a ser consultado")):
     """
     Retorna todos os dados disponíveis para um terceirizado específico.
 
@@ -217,70 +1587,156 @@ async def get_terceirizados_id(id: int = Path(..., description="ID do terceiriza
         HTTPException 422: Erro de validação (ex: ID inválido ou negativo).
         HTTPException 500: Erro interno ao acessar o banco de dados.
     """
+    return await cached_response(request, "terceirizados_id", {"id": id}, lambda: get_terceirizado(id))
+
+async def get_terceirizado(id: int):
+    """
+    Consulta todos os dados de um terceirizado a partir do seu id.
+    """
     def query():
         try:
-            with duckdb.connect(DB_FILE) as con:
-                result = con.sql("""SELECT 
-                                    id_terceirizado,
-                                    terceirizado_cpf,
-                                    terceirizado_nome,
-                                    terceirizado_categoria_profissional,
-                                    terceirizado_escolaridade,
-                                    terceirizado_salario,
-                                    terceirizado_custo,
-                                    jornada_horas,
-                                    empresa_cnpj,
-                                    empresa_razao_social,
-                                    contrato_numero,
-                                    orgao_superior_sigla,
-                                    unidade_gestora_sigla,
-                                    unidade_gestora_nome,
-                                    unidade_gestora_codigo,
-                                    orgao_sigla,
-                                    orgao_nome,
-                                    orgao_codigo_siafi,
-                                    orgao_codigo_siape,
-                                    unidade_prestacao_nome,
-                                    mes_carga
-                                    FROM terceirizados_gold
+            with database_cursor() as con:
+                result = con.sql(f"""SELECT {", ".join(DETAIL_COLUMNS)}
+                                    FROM {SERVED_TABLE}
                                     WHERE id_terceirizado = ?
                                     """,
                                     params=[id]).fetchone()
                 if not result:
                     return None
                 
-                columns = [
-                    "id_terceirizado",
-                    "terceirizado_cpf",
-                    "terceirizado_nome",
-                    "terceirizado_categoria_profissional",
-                    "terceirizado_escolaridade",
-                    "terceirizado_salario",
-                    "terceirizado_custo",
-                    "jornada_horas",
-                    "empresa_cnpj",
-                    "empresa_razao_social",
-                    "contrato_numero",
-                    "orgao_superior_sigla",
-                    "unidade_gestora_sigla",
-                    "unidade_gestora_nome",
-                    "unidade_gestora_codigo",
-                    "orgao_sigla",
-                    "orgao_nome",
-                    "orgao_codigo_siafi",
-                    "orgao_codigo_siape",
-                    "unidade_prestacao_nome",
-                    "mes_carga"
-                ]
-                
-                data = dict(zip(columns, result))
+                data = dict(zip(DETAIL_COLUMNS, result))
         except Exception as e:
             raise HTTPException(status_code=500, detail="Erro interno ao acessar o banco de dados")
                 
         return data
         
-    data = await asyncio.to_thread(query)
+    data = await run_in_thread(query)
     if not data:
         raise HTTPException(status_code=404, detail="Registro não encontrado para o ID informado")
     
-    return {"data": data}
\ No newline at end of file
+    return {"data": data}
+
+STATISTICS_TABLES = {
+    "orgaos": {
+        "table": "terceirizados_estatisticas_orgao",
+        "columns": ["mes_carga", "orgao_sigla", "orgao_nome", "quantidade_terceirizados",
+                    "salario_total", "custo_total", "salario_medio", "custo_medio"]
+    },
+    "empresas": {
+        "table": "terceirizados_estatisticas_empresa",
+        "columns": ["mes_carga", "empresa_cnpj", "empresa_razao_social", "quantidade_terceirizados", "quantidade_orgaos",
+                    "salario_total", "custo_total", "salario_medio", "custo_medio"]
+    },
+    "meses": {
+        "table": "terceirizados_estatisticas_mes",
+        "columns": ["mes_carga", "quantidade_terceirizados", "quantidade_orgaos", "quantidade_empresas",
+                    "salario_total", "custo_total", "salario_medio", "custo_medio"]
+    }
+}
+
+def query_statistics(group: str, mes_carga: datetime.date | None, page_size: int, page: int):
+    """
+    Consulta uma das tabelas de estatísticas pré-agregadas da camada gold.
+
+    Parâmetros:
+        group (str): Agrupamento (orgaos, empresas ou meses).
+        mes_carga (date): Mês da carga. Se None, usa o mês mais recente (exceto no agrupamento por mês,
+            que retorna todos os meses).
+        page_size (int): Número de registros por página.
+        page (int): Número da página (começa em 0).
+
+    Retorno:
+        tuple: Mês consultado e lista de dicionários com as estatísticas.
+    """
+    table = STATISTICS_TABLES[group]["table"]
+    columns = STATISTICS_TABLES[group]["columns"]
+    try:
+        with database_cursor() as con:
+            if group == "meses":
+                where = "WHERE mes_carga = ?" if mes_carga else ""
+                order = "mes_carga ASC"
+                params = [mes_carga] if mes_carga else []
+            else:
+                if mes_carga is None:
+                    mes_carga = con.sql(f"SELECT MAX(mes_carga) FROM {table}").fetchone()[0]
+                where = "WHERE mes_carga = ?"
+                order = "custo_total DESC"
+                params = [mes_carga]
+            result = con.sql(f"""SELECT {", ".join(columns)}
+                                 FROM {table}
+                                 {where}
+                                 ORDER BY {order}
+                                 LIMIT ? OFFSET ?""",
+                                 params=params + [page_size, page * page_size]).fetchall()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Erro interno ao acessar o banco de dados")
+
+    return mes_carga, [dict(zip(columns, row)) for row in result]
+
+@app.get("/estatisticas/{agrupamento}", 
+          summary="Estatísticas agregadas de terceirizados",
+          description="""
+            Retorna quantidade de terceirizados e totais e médias de salário e custo, pré-calculados a cada execução do pipeline.
+
+            - `orgaos`: por órgão onde o terceirizado trabalha, no mês informado (padrão: mês mais recente), ordenado por custo total decrescente
+            - `empresas`: por CNPJ da empresa terceirizada, no mês informado (padrão: mês mais recente), ordenado por custo total decrescente
+            - `meses`: por mês de carga, em ordem crescente
+            - Máximo de 200 registros por página
+            """,
+            responses={
+                404: {
+                    "description": "Nenhum registro encontrado para os parâmetros informados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Nenhum registro encontrado para os parâmetros informados"}
+                        }
+                    }
+                },
+                422: {
+                    "description": "Erro de validação (ex: agrupamento inexistente)",
+                },
+                500: {
+                    "description": "Erro interno ao acessar o banco de dados",
+                    "content": {
+                        "application/json": {
+                            "example": {"detail": "Erro interno ao acessar o banco de dados"}
+                        }
+                    }
+                }
+            })
+async def get_estatisticas(request: Request,
+                           agrupamento: Literal["orgaos", "empresas", "meses"] = Path(..., description="Agrupamento das estatísticas"),
+                           mes_carga: datetime.date | None = Query(None, description="Mês da carga dos dados (YYYY-MM-01)"),
+                           page_size: int = Query(50, ge=1, le=200, description="Quantidade de registros por página (máx: 200)"),
+                           page: int = Query(0, ge=0, description="Número da página (inicia em 0)")):
+    """
+    Retorna estatísticas pré-agregadas de terceirizados por órgão, por empresa ou por mês.
+    As consultas leem apenas as tabelas de resumo, com tempo de resposta independente do tamanho da tabela gold.
+
+    Parâmetros:
+        agrupamento (str): orgaos, empresas ou meses.
+        mes_carga (date): Mês da carga dos dados.
+        page_size (int): Número de registros retornados por página. Máximo permitido: 200.
+        page (int): Número da página a ser retornada (começa em 0).
+
+    Retorno:
+        dict: Contém os seguintes campos:
+            - agrupamento (str): Agrupamento consultado.
+            - mes_carga (date): Mês consultado. None no agrupamento por mês sem filtro.
+            - page_size (int): Quantidade de registros retornados nesta página.
+            - page (int): Número da página atual.
+            - data (list): Lista de dicionários com as estatísticas.
+
+    Exceções:
+        HTTPException 404: Nenhum registro encontrado para os parâmetros informados.
+        HTTPException 422: Erro de validação (ex: agrupamento inexistente).
+        HTTPException 500: Erro interno ao acessar o banco de dados.
+    """
+    async def build():
+        mes, data = await run_in_thread(query_statistics, agrupamento, mes_carga, page_size, page)
+        if not data:
+            raise HTTPException(status_code=404, detail="Nenhum registro encontrado para os parâmetros informados")
+        return {"agrupamento": agrupamento, "mes_carga": mes, "page_size": page_size, "page": page, "data": data}
+
+    params = {"agrupamento": agrupamento, "mes_carga": mes_carga, "page_size": page_size, "page": page}
+    return await cached_response(request, "estatisticas", params, build)
\ No newline at end of file
@@ -0,0 +1,197 @@
+import argparse
+import codecs
+import json
+import os
+import shutil
+import unicodedata
+
+import duckdb
+
+#Colunas dos arquivos da CGU, na mesma ordem da tabela new_data da task load_raw_data
+RAW_COLUMNS = [
+    "id_terc", "sg_orgao_sup_tabela_ug", "cd_ug_gestora", "nm_ug_tabela_ug", "sg_ug_gestora",
+    "nr_contrato", "nr_cnpj", "nm_razao_social", "nr_cpf", "nm_terceirizado",
+    "nm_categoria_profissional", "nm_escolaridade", "nr_jornada", "nm_unidade_prestacao",
+    "vl_mensal_salario", "vl_mensal_custo", "Num_Mes_Carga", "Mes_Carga", "Ano_Carga",
+    "sg_orgao", "nm_orgao", "cd_orgao_siafi", "cd_orgao_siape"
+]
+
+#Tamanho do início sem acentos da variação latin-1 com prefixo ASCII: o dobro da amostra (SAMPLE_BYTES, 256 KB)
+#lida pelo flow para detectar o dialeto, de forma que o primeiro byte não ASCII fique fora dela
+ASCII_PREFIX_BYTES = 512 * 1024
+
+#Variações de arquivo encontradas na fonte, usadas em rodízio entre os meses gerados.
+#O codec utf-16 grava o BOM no início do arquivo
+VARIANTS = [
+    {"formato": "csv", "encoding": "utf-8", "delimitador": ";", "prefixo_ascii_bytes": 0},
+    {"formato": "csv", "encoding": "latin-1", "delimitador": ";", "prefixo_ascii_bytes": 0},
+    {"formato": "csv", "encoding": "utf-8", "delimitador": ",", "prefixo_ascii_bytes": 0},
+    {"formato": "xlsx", "encoding": None, "delimitador": None, "prefixo_ascii_bytes": 0},
+    {"formato": "csv", "encoding": "utf-16", "delimitador": ";", "prefixo_ascii_bytes": 0},
+    {"formato": "csv", "encoding": "latin-1", "delimitador": ";", "prefixo_ascii_bytes": ASCII_PREFIX_BYTES}
+]
+
+#A CGU publica os arquivos nos meses de janeiro, maio e setembro
+SOURCE_MONTHS = ["01", "05", "09"]
+MONTH_NAMES = {"01": "JANEIRO", "05": "MAIO", "09": "SETEMBRO"}
+XLSX_MAX_ROWS = 1048575
+
+ORGAOS = [
+    ("MEC", "MINISTÉRIO DA EDUCAÇÃO", "26000", "40000"),
+    ("MS", "MINISTÉRIO DA SAÚDE", "36000", "25000"),
+    ("MF", "MINISTÉRIO DA FAZENDA", "25000", "17000"),
+    ("MJSP", "MINISTÉRIO DA JUSTIÇA E SEGURANÇA PÚBLICA", "30000", "30000"),
+    ("MD", "MINISTÉRIO DA DEFESA", "52000", "52000"),
+    ("MAPA", "MINISTÉRIO DA AGRICULTURA E PECUÁRIA", "22000", "22000"),
+    ("MCTI", "MINISTÉRIO DA CIÊNCIA, TECNOLOGIA E INOVAÇÃO", "24000", "24000"),
+    ("MRE", "MINISTÉRIO DAS RELAÇÕES EXTERIORES", "35000", "35000")
+]
+NOMES = ["JOSÉ", "MARIA", "JOÃO", "ANTÔNIO", "ANA", "FRANCISCO", "LUCIANA", "MÁRCIO", "CONCEIÇÃO", "SEBASTIÃO"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "GONÇALVES", "ARAÚJO", "CONCEIÇÃO", "MELO"]
+CATEGORIAS = ["VIGILANTE", "AUXILIAR DE LIMPEZA", "TÉCNICO EM INFORMÁTICA", "RECEPCIONISTA", "COPEIRO",
+              "MOTORISTA", "ELETRICISTA", "ASSISTENTE ADMINISTRATIVO"]
+ESCOLARIDADES = ["ENSINO FUNDAMENTAL COMPLETO", "ENSINO MÉDIO COMPLETO", "ENSINO SUPERIOR COMPLETO", "PÓS-GRADUAÇÃO"]
+RAMOS = ["SERVIÇOS GERAIS", "CONSTRUÇÃO", "LIMPEZA E CONSERVAÇÃO", "SEGURANÇA", "TECNOLOGIA DA INFORMAÇÃO"]
+CIDADES = ["BRASÍLIA", "SÃO PAULO", "BELÉM", "GOIÂNIA", "MACEIÓ", "FLORIANÓPOLIS", "VITÓRIA", "CUIABÁ"]
+
+def sql_list(values: list):
+    return "[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+
+def pick(values: list, seed: int):
+    """
+    Expressão SQL que escolhe de forma determinística um item da lista a partir do número da linha.
+    """
+    return f"{sql_list(values)}[1 + (hash(i, {seed}) % {len(values)})::BIGINT]"
+
+def month_query(year: int, month: str, rows: int, first_id: int):
+    """
+    Consulta DuckDB que gera as linhas sintéticas de um mês, com as 23 colunas VARCHAR dos arquivos da CGU.
+    Valores monetários usam vírgula decimal e textos têm acentuação, como na fonte.
+    """
+    orgao = f"(hash(i, 1) % {len(ORGAOS)})::BIGINT"
+    return f"""
+        SELECT
+            (i + {first_id})::VARCHAR AS id_terc,
+            {sql_list([o[0] for o in ORGAOS])}[1 + {orgao}] AS sg_orgao_sup_tabela_ug,
+            (150000 + hash(i, 2) % 900)::VARCHAR AS cd_ug_gestora,
+            'UNIDADE GESTORA ' || (hash(i, 2) % 900)::VARCHAR AS nm_ug_tabela_ug,
+            'UG' || (hash(i, 2) % 900)::VARCHAR AS sg_ug_gestora,
+            lpad((hash(i, 3) % 5000)::VARCHAR, 5, '0') || '/{year}' AS nr_contrato,
+            lpad((10000000000 + hash(i, 4) % 2000)::VARCHAR, 14, '0') AS nr_cnpj,
+            'EMPRESA ' || {pick(RAMOS, 4)} || ' ' || (hash(i, 4) % 2000)::VARCHAR || ' LTDA' AS nm_razao_social,
+            '***.' || lpad((hash(i, 5) % 1000)::VARCHAR, 3, '0') || '.' || lpad((hash(i, 6) % 1000)::VARCHAR, 3, '0') || '-**' AS nr_cpf,
+            {pick(NOMES, 7)} || ' ' || {pick(SOBRENOMES, 8)} || ' ' || {pick(SOBRENOMES, 9)} AS nm_terceirizado,
+            {pick(CATEGORIAS, 10)} AS nm_categoria_profissional,
+            {pick(ESCOLARIDADES, 11)} AS nm_escolaridade,
+            {pick(["30", "36", "40", "44"], 12)} AS nr_jornada,
+            'UNIDADE ' || {pick(CIDADES, 13)} AS nm_unidade_prestacao,
+            replace(printf('%.2f', 1412 + hash(i, 14) % 8000 + (hash(i, 15) % 100) / 100), '.', ',') AS vl_mensal_salario,
+            replace(printf('%.2f', (1412 + hash(i, 14) % 8000) * 1.85::DOUBLE), '.', ',') AS vl_mensal_custo,
+            '{int(month)}' AS Num_Mes_Carga,
+            '{MONTH_NAMES[month]}' AS Mes_Carga,
+            '{year}' AS Ano_Carga,
+            {sql_list([o[0] for o in ORGAOS])}[1 + {orgao}] AS sg_orgao,
+            {sql_list([o[1] for o in ORGAOS])}[1 + {orgao}] AS nm_orgao,
+            {sql_list([o[2] for o in ORGAOS])}[1 + {orgao}] AS cd_orgao_siafi,
+            {sql_list([o[3] for o in ORGAOS])}[1 + {orgao}] AS cd_orgao_siape
+        FROM range({rows}) t(i)
+        """
+
+def source_months(months: int, first_year: int = 2019):
+    """
+    Lista os primeiros `months` meses de publicação da fonte (janeiro, maio e setembro) a partir de first_year.
+    """
+    return [(first_year + n // len(SOURCE_MONTHS), SOURCE_MONTHS[n % len(SOURCE_MONTHS)]) for n in range(months)]
+
+def strip_accents(text: str):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+def transcode(source: str, target: str, encoding: str, ascii_prefix_bytes: int = 0):
+    """
+    Regrava um arquivo texto UTF-8 em outro encoding, em blocos.
+
+    Com ascii_prefix_bytes, os acentos são removidos dos blocos iniciais até que pelo menos essa quantidade
+    de bytes tenha sido gravada, simulando um arquivo latin-1 cuja amostra inicial é só ASCII.
+    """
+    with codecs.open(source, "r", "utf-8") as src, codecs.open(target, "w", encoding) as dst:
+        written = 0
+        while written < ascii_prefix_bytes:
+            chunk = src.read(1024 * 1024)
+            if not chunk:
+                break
+            chunk = strip_accents(chunk)
+            dst.write(chunk)
+            written += len(chunk)
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+def generate(output_dir: str, months: int, rows_per_month: int):
+    """
+    Gera arquivos sintéticos no formato dos arquivos de terceirizados da CGU, um por mês de referência,
+    alternando csv UTF-8, latin-1 e UTF-16 com BOM, delimitadores, xlsx e um csv latin-1 cujo início
+    (ASCII_PREFIX_BYTES) não tem acentos.
+
+    Os arquivos ficam em `<output_dir>/terceirizados/arquivos/`, a mesma estrutura de links da página
+    da CGU, e um `dataset.json` descreve os arquivos e o intervalo de ids gerados.
+
+    Parâmetros:
+        output_dir (str): Diretório de saída.
+        months (int): Quantidade de meses de referência.
+        rows_per_month (int): Quantidade de linhas de cada arquivo.
+
+    Retorno:
+        dict: Descrição dos arquivos gerados.
+    """
+    files_dir = os.path.join(output_dir, "terceirizados", "arquivos")
+    os.makedirs(files_dir, exist_ok=True)
+    files = []
+    with duckdb.connect() as con:
+        for n, (year, month) in enumerate(source_months(months)):
+            variant = VARIANTS[n % len(VARIANTS)]
+            if variant["formato"] == "xlsx" and rows_per_month > XLSX_MAX_ROWS:
+                variant = VARIANTS[0]
+            name = f"terceirizados_{year}{month}.{variant['formato']}"
+            path = os.path.join(files_dir, name)
+            query = month_query(year, month, rows_per_month, n * rows_per_month + 1)
+            if variant["formato"] == "xlsx":
+                con.execute("INSTALL excel; LOAD excel;")
+                con.execute(f"COPY ({query}) TO '{path}' (FORMAT xlsx, HEADER true)")
+            elif variant["encoding"] == "utf-8":
+                con.execute(f"COPY ({query}) TO '{path}' (FORMAT csv, HEADER true, DELIMITER '{variant['delimitador']}')")
+            else:
+                utf8_path = path + ".utf8"
+                con.execute(f"COPY ({query}) TO '{utf8_path}' (FORMAT csv, HEADER true, DELIMITER '{variant['delimitador']}')")
+                transcode(utf8_path, path, variant["encoding"], variant["prefixo_ascii_bytes"])
+                os.remove(utf8_path)
+            files.append({"arquivo": name, "mes_referencia": f"{year}-{month}", "linhas": rows_per_month,
+                          "tamanho_bytes": os.path.getsize(path), **variant})
+
+    dataset = {"meses": months, "linhas_por_mes": rows_per_month, "total_linhas": months * rows_per_month,
+               "ids": [1, months * rows_per_month], "arquivos": files}
+    with open(os.path.join(output_dir, "dataset.json"), "w") as f:
+        json.dump(dataset, f, indent=2)
+    return dataset
+
+def write_index(output_dir: str, base_url: str):
+    """
+    Grava a página índice com os links dos arquivos gerados, no mesmo formato de link da página da CGU
+    lido pela task load_raw_data (`<base_url>/arquivos/<arquivo>`).
+    """
+    with open(os.path.join(output_dir, "dataset.json")) as f:
+        dataset = json.load(f)
+    links = "\n".join(f'<a href="{base_url}/arquivos/{file["arquivo"]}">{file["arquivo"]}</a><br>'
+                      for file in dataset["arquivos"])
+    with open(os.path.join(output_dir, "terceirizados", "index.html"), "w") as f:
+        f.write(f"<html><body>\n{links}\n</body></html>\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera arquivos sintéticos de terceirizados no formato da CGU")
+    parser.add_argument("--saida", default="benchmarks/dados", help="Diretório de saída")
+    parser.add_argument("--meses", type=int, default=6, help="Quantidade de meses de referência")
+    parser.add_argument("--linhas-por-mes", type=int, default=100000, help="Quantidade de linhas de cada arquivo")
+    parser.add_argument("--url-base", default=None, help="URL base da página índice (ex: http://localhost:8080/terceirizados)")
+    args = parser.parse_args()
+
+    dataset = generate(args.saida, args.meses, args.linhas_por_mes)
+    if args.url_base:
+        write_index(args.saida, args.url_base)
+    print(json.dumps(dataset, indent=2, ensure_ascii=False))
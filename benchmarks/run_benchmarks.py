@@ -0,0 +1,339 @@
+import argparse
+import concurrent.futures
+import datetime
+import functools
+import http.server
+import json
+import os
+import platform
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from generate_data import generate, write_index
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class SourceRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Handler do servidor local da fonte: arquivos com ETag e Last-Modified, requisições Range com If-Range
+    (retomada de downloads) e falhas simuladas. Com probabilidade `failure_rate`, a conexão é encerrada
+    depois de enviar metade do corpo da resposta.
+    """
+    failure_rate = 0.0
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = self.date_time_string(stat.st_mtime)
+        start = 0
+        requested = re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))
+        if requested and self.headers.get("If-Range", etag) in (etag, last_modified):
+            start = int(requested.group(1))
+            if start >= stat.st_size:
+                self.send_error(416)
+                return None
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(stat.st_size - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{stat.st_size - 1}/{stat.st_size}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        if random.random() < self.failure_rate:
+            remaining = os.fstat(source.fileno()).st_size - source.tell()
+            outputfile.write(source.read(remaining // 2))
+            self.close_connection = True
+            return
+        super().copyfile(source, outputfile)
+
+def serve_directory(directory: str, failure_rate: float = 0.0):
+    """
+    Sobe um servidor HTTP local em segundo plano servindo o diretório informado, no papel da página da CGU.
+
+    Parâmetros:
+        directory (str): Diretório servido.
+        failure_rate (float): Probabilidade de cada resposta ser interrompida no meio do envio.
+
+    Retorno:
+        str: URL base do servidor.
+    """
+    port = free_port()
+    handler = functools.partial(type("Handler", (SourceRequestHandler,), {"failure_rate": failure_rate}),
+                                directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+def start_s3(endpoint: str | None):
+    """
+    Usa o S3 alternativo informado (ex: MinIO) ou sobe um servidor moto local.
+
+    Retorno:
+        str: URL do endpoint S3.
+    """
+    if endpoint:
+        return endpoint
+    from moto.server import ThreadedMotoServer
+    port = free_port()
+    ThreadedMotoServer(ip_address="127.0.0.1", port=port).start()
+    return f"http://127.0.0.1:{port}"
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return round(time.perf_counter() - start, 3)
+
+def dbt_model_timings(project_dir: str):
+    """
+    Lê os tempos de execução de cada modelo do último comando DBT (run_results.json) e os agrupa por camada,
+    usando a pasta do modelo no projeto (bronze, silver ou gold).
+    """
+    with open(os.path.join(project_dir, "target", "run_results.json")) as f:
+        run_results = json.load(f)
+    with open(os.path.join(project_dir, "target", "manifest.json")) as f:
+        nodes = json.load(f)["nodes"]
+    models, layers = {}, {}
+    for result in run_results["results"]:
+        node = nodes.get(result["unique_id"], {})
+        if node.get("resource_type") != "model":
+            continue
+        layer = node["fqn"][1] if len(node["fqn"]) > 2 else "outros"
+        models[node["name"]] = {"camada": layer, "segundos": round(result["execution_time"], 3), "status": result["status"]}
+        layers[layer] = round(layers.get(layer, 0) + result["execution_time"], 3)
+    return {"segundos_total": round(run_results["elapsed_time"], 3), "camadas": layers, "modelos": models}
+
+def run_pipeline(args, dataset: dict, work_dir: str):
+    """
+    Executa o flow do Prefect em etapas (criação do bucket, carga de dados brutos e DBT com exportação),
+    medindo o tempo de cada uma.
+    """
+    from flows.terceirizados_pipeline import pipeline, FlowParameters, ManualLoadParameters
+
+    load_parameters = FlowParameters(tasks=["Carregar dados brutos"], busca_automatica_dados_novos=False,
+                                     workers_carga=args.workers_carga, carga_streaming=args.carga_streaming)
+    dbt_parameters = FlowParameters(tasks=["Rodar DBT"], comando_dbt="run", dbt_full_refresh=True,
+                                    perfil_dbt=args.perfil_dbt)
+    manual = ManualLoadParameters(ano_inicio_carga=2019, mes_inicio_carga="01", ano_fim_carga=2050, mes_fim_carga="01")
+
+    timed(pipeline, FlowParameters(tasks=["Criar bucket"]), manual)
+    load_seconds = timed(pipeline, load_parameters, manual)
+    dbt_seconds = timed(pipeline, dbt_parameters, manual)
+    dbt = dbt_model_timings(os.path.join(work_dir, "dbt_pipeline"))
+    return {
+        "ingestao": {
+            "segundos": load_seconds,
+            "arquivos": len(dataset["arquivos"]),
+            "linhas": dataset["total_linhas"],
+            "bytes": sum(file["tamanho_bytes"] for file in dataset["arquivos"]),
+            "linhas_por_segundo": round(dataset["total_linhas"] / load_seconds)
+        },
+        "dbt": dbt,
+        "exportacao_camadas": {"segundos": round(dbt_seconds - dbt["segundos_total"], 3)}
+    }
+
+def start_api(env: dict, work_dir: str, name: str = "api"):
+    """
+    Sobe a API com uvicorn em um subprocesso e espera até que ela sirva dados.
+    Cada execução usa o próprio diretório de trabalho (`name`), onde ficam os dados locais da API.
+
+    Retorno:
+        tuple: Processo da API, URL base e tempo até a primeira resposta com dados (segundos).
+    """
+    port = free_port()
+    api_dir = os.path.join(work_dir, name)
+    os.makedirs(api_dir, exist_ok=True)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.join(REPO_DIR, "api"),
+                                "--port", str(port), "--log-level", "warning"], cwd=api_dir, env=env)
+    url = f"http://127.0.0.1:{port}"
+    while time.perf_counter() - start < 300:
+        try:
+            if requests.get(f"{url}/terceirizados", params={"page_size": 1}, timeout=5).status_code == 200:
+                return process, url, round(time.perf_counter() - start, 3)
+        except requests.ConnectionError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("A API encerrou durante a inicialização")
+        time.sleep(0.5)
+    process.terminate()
+    raise TimeoutError("A API não serviu dados em 300s")
+
+def percentile(values: list, p: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def load_test(url: str, scenario, requests_count: int, concurrency: int):
+    """
+    Dispara `requests_count` requisições de um cenário com `concurrency` threads simultâneas,
+    cada thread com sua própria sessão HTTP.
+
+    Retorno:
+        dict: Vazão, latências (ms) e contagem de respostas por status.
+    """
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        method, path, kwargs = scenario()
+        start = time.perf_counter()
+        response = local.session.request(method, f"{url}{path}", timeout=120, **kwargs)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, range(requests_count)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, _ in results]
+    status = {}
+    for _, code in results:
+        status[str(code)] = status.get(str(code), 0) + 1
+    return {
+        "requisicoes": requests_count,
+        "concorrencia": concurrency,
+        "requisicoes_por_segundo": round(requests_count / elapsed, 1),
+        "latencia_ms": {
+            "media": round(statistics.mean(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2)
+        },
+        "status": status
+    }
+
+def api_scenarios(dataset: dict, total_pages: int):
+    """
+    Cenários de carga da API. Ids e páginas são sorteados dentro do intervalo gerado.
+    """
+    first_id, last_id = dataset["ids"]
+    orgaos = ["MEC", "MS", "MF", "MJSP", "MD", "MAPA", "MCTI", "MRE"]
+    return {
+        "terceirizados_primeira_pagina": lambda: ("GET", "/terceirizados", {"params": {"page_size": 50}}),
+        "terceirizados_pagina_aleatoria": lambda: ("GET", "/terceirizados",
+                                                   {"params": {"page_size": 50, "page": random.randrange(total_pages)}}),
+        "terceirizados_id": lambda: ("GET", f"/terceirizados/{random.randint(first_id, last_id)}", {}),
+        "terceirizados_search": lambda: ("GET", "/terceirizados/search",
+                                         {"params": {"orgao_superior_sigla": random.choice(orgaos), "page_size": 50}}),
+        "terceirizados_batch": lambda: ("POST", "/terceirizados/batch",
+                                        {"json": {"ids": random.sample(range(first_id, last_id + 1), min(100, last_id))}}),
+        "estatisticas_orgaos": lambda: ("GET", "/estatisticas/orgaos", {})
+    }
+
+def run_api_benchmarks(args, dataset: dict, env: dict, work_dir: str, serving_mode: str = "local"):
+    """
+    Mede a API em um modo de serviço: `local` (banco DuckDB baixado do bucket) ou `s3` (MODO_SERVICO=s3,
+    consultas direto nos parquets do snapshot no S3 local, com o spill em um diretório próprio).
+    """
+    env = {**env, "MODO_SERVICO": serving_mode}
+    if serving_mode == "s3":
+        env["DIRETORIO_SPILL_S3"] = os.path.join(work_dir, "spill_s3")
+    process, url, startup_seconds = start_api(env, work_dir, f"api_{serving_mode}")
+    try:
+        total_pages = max(1, dataset["total_linhas"] // 50)
+        results = {"inicializacao_segundos": startup_seconds, "cenarios": {}}
+        for name, scenario in api_scenarios(dataset, total_pages).items():
+            results["cenarios"][name] = load_test(url, scenario, args.requisicoes, args.concorrencia)
+
+        start = time.perf_counter()
+        response = requests.get(f"{url}/terceirizados/export", params={"formato": "parquet"}, timeout=600)
+        results["exportacao_parquet"] = {"segundos": round(time.perf_counter() - start, 3), "bytes": len(response.content),
+                                         "status": response.status_code}
+        results["cache"] = requests.get(f"{url}/admin/cache", timeout=10).json()
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da carga, do DBT e da API com dados sintéticos em um S3 local")
+    parser.add_argument("--meses", type=int, default=6, help="Quantidade de meses de referência gerados")
+    parser.add_argument("--linhas-por-mes", type=int, default=100000, help="Quantidade de linhas de cada arquivo gerado")
+    parser.add_argument("--workers-carga", type=int, default=4, help="Parâmetro workers_carga do flow")
+    parser.add_argument("--carga-streaming", action="store_true", help="Parâmetro carga_streaming do flow")
+    parser.add_argument("--falhas-download", type=float, default=0.0,
+                        help="Probabilidade (0 a 1) de cada resposta do servidor local da fonte ser interrompida no meio")
+    parser.add_argument("--perfil-dbt", default="performance", choices=["dev", "performance"], help="Parâmetro perfil_dbt do flow")
+    parser.add_argument("--requisicoes", type=int, default=1000, help="Requisições por cenário da API")
+    parser.add_argument("--concorrencia", type=int, default=16, help="Requisições simultâneas na API")
+    parser.add_argument("--sem-cache", action="store_true", help="Desabilita o cache de respostas da API")
+    parser.add_argument("--modos-servico", nargs="+", default=["local", "s3"], choices=["local", "s3"],
+                        help="Modos de serviço da API medidos (MODO_SERVICO)")
+    parser.add_argument("--s3-endpoint", default=None, help="Endpoint S3 alternativo já em execução (ex: MinIO). Sem ele, sobe um moto local")
+    parser.add_argument("--saida", default=os.path.join(REPO_DIR, "benchmarks", "resultados"), help="Diretório dos resultados JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="terceirizados_benchmark_")
+    os.symlink(os.path.join(REPO_DIR, "dbt_pipeline"), os.path.join(work_dir, "dbt_pipeline"))
+
+    start = time.perf_counter()
+    dataset = generate(os.path.join(work_dir, "fonte"), args.meses, args.linhas_por_mes)
+    generation_seconds = round(time.perf_counter() - start, 3)
+    source_url = f"{serve_directory(os.path.join(work_dir, 'fonte'), args.falhas_download)}/terceirizados"
+    write_index(os.path.join(work_dir, "fonte"), source_url)
+
+    #Variáveis lidas pelo pipeline e pela API na importação dos módulos
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_REGION", "sa-east-1")
+    os.environ.setdefault("BUCKET_NAME", "terceirizados-benchmark")
+    os.environ["S3_ENDPOINT_URL"] = start_s3(args.s3_endpoint)
+    os.environ["URL_BASE_DADOS"] = source_url
+    os.environ["URL_API"] = "http://127.0.0.1:9"
+    api_env = dict(os.environ)
+    if args.sem_cache:
+        api_env["CACHE_RESPOSTAS_TAMANHO"] = "0"
+
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(work_dir)
+    results = {
+        "data_execucao": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "parametros": vars(args),
+        "ambiente": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "dados": {"geracao_segundos": generation_seconds, **{k: v for k, v in dataset.items() if k != "arquivos"},
+                  "arquivos": dataset["arquivos"]},
+        **run_pipeline(args, dataset, work_dir)
+    }
+    for serving_mode in args.modos_servico:
+        results["api" if serving_mode == "local" else f"api_{serving_mode}"] = run_api_benchmarks(
+            args, dataset, api_env, work_dir, serving_mode)
+
+    os.makedirs(args.saida, exist_ok=True)
+    output = os.path.join(args.saida, f"benchmark_{datetime.datetime.now():%Y%m%dT%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {output}")
+
+if __name__ == "__main__":
+    main()
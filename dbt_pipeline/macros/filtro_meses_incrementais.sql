@@ -0,0 +1,18 @@
+{#
+    Filtro das execuções incrementais dos modelos particionados por mes_referencia.
+
+    - Se a task de carga informar os meses carregados (var `meses_carregados`, lista de 'YYYY-MM'),
+      apenas esses meses são lidos e substituídos no modelo, o que inclui meses republicados na fonte.
+    - Sem a var, são lidos apenas os meses posteriores ao último mes_referencia já presente no modelo.
+    - Fora de execuções incrementais (primeira execução ou --full-refresh), não filtra nada.
+#}
+{% macro filtro_meses_incrementais(coluna='mes_referencia') %}
+    {%- if is_incremental() -%}
+        {%- set meses = var('meses_carregados', []) -%}
+        {%- if meses | length > 0 %}
+WHERE {{ coluna }} IN ({% for mes in meses %}DATE '{{ mes }}-01'{% if not loop.last %}, {% endif %}{% endfor %})
+        {%- else %}
+WHERE {{ coluna }} > (SELECT COALESCE(MAX({{ coluna }}), DATE '1900-01-01') FROM {{ this }})
+        {%- endif -%}
+    {%- endif -%}
+{% endmacro %}
@@ -0,0 +1,34 @@
+{#
+    Atributos versionados no histórico de terceirizados: uma mudança em qualquer um deles, de um
+    mês de referência para o seguinte, abre uma nova versão do terceirizado no contrato.
+#}
+{% macro atributos_historico() %}
+{%- do return([
+    'terceirizado_nome', 'terceirizado_categoria_profissional', 'terceirizado_escolaridade',
+    'terceirizado_salario', 'terceirizado_custo', 'jornada_horas',
+    'empresa_cnpj', 'empresa_razao_social',
+    'orgao_superior_sigla', 'unidade_gestora_sigla', 'unidade_gestora_nome', 'unidade_gestora_codigo',
+    'orgao_sigla', 'orgao_nome', 'orgao_codigo_siafi', 'orgao_codigo_siape', 'unidade_prestacao_nome'
+]) -%}
+{% endmacro %}
+
+{#
+    Primeiro mês de referência (inclusivo) reprocessado pelo histórico de terceirizados.
+
+    - Com a var `meses_carregados`, o mês mais antigo carregado: meses republicados na fonte
+      refazem o histórico a partir deles.
+    - Sem a var, os meses posteriores ao último já processado.
+    - Fora de execuções incrementais, todos os meses.
+#}
+{% macro inicio_historico() %}
+    {%- if is_incremental() -%}
+        {%- set meses = var('meses_carregados', []) -%}
+        {%- if meses | length > 0 -%}
+DATE '{{ meses | min }}-01'
+        {%- else -%}
+(SELECT COALESCE(MAX(ultimo_mes) + 1, DATE '1900-01-01') FROM {{ this }})
+        {%- endif -%}
+    {%- else -%}
+DATE '1900-01-01'
+    {%- endif -%}
+{% endmacro %}
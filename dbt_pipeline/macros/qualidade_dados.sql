@@ -0,0 +1,104 @@
+{#
+    Relatório de qualidade de dados de uma camada, calculado em uma única varredura.
+
+    Cada regra é um dicionário com:
+        - nome: identificador da regra no relatório.
+        - descricao: descrição da regra.
+        - severidade: 'error' (falha o teste assert_qualidade_dados) ou 'warn' (apenas reportada).
+        - violacao: condição SQL verdadeira para as linhas que violam a regra, contada com COUNT_IF; ou
+        - agregado: expressão de agregação que retorna a quantidade de violações do mês (ex: duplicidades).
+
+    Todas as regras são agregadas juntas, por mes_referencia, em uma só leitura da relação, e o resultado
+    é desdobrado em uma linha por mês e regra. Em execuções incrementais, só os meses carregados são verificados
+    (macro filtro_meses_incrementais). A var `qualidade_amostra_percentual` verifica uma amostra das linhas
+    de cada mês em vez de todas: regras por linha passam a estimar a taxa de violação, e duplicidades
+    só são encontradas entre as linhas sorteadas.
+#}
+{% macro relatorio_qualidade(relacao, camada, regras) %}
+{%- set amostra = var('qualidade_amostra_percentual', 100) -%}
+WITH dados AS (
+    SELECT *
+    FROM {{ relacao }}
+    {{ filtro_meses_incrementais() }}
+),
+
+amostra AS (
+    SELECT *
+    FROM dados
+    {%- if amostra < 100 %}
+    USING SAMPLE {{ amostra }} PERCENT (bernoulli)
+    {%- endif %}
+),
+
+agregado AS MATERIALIZED (
+    SELECT
+        mes_referencia,
+        COUNT(*) AS linhas_verificadas
+        {%- for regra in regras %},
+        {% if regra.agregado is defined %}{{ regra.agregado }}{% else %}COUNT_IF({{ regra.violacao }}){% endif %} AS violacoes_{{ loop.index }}
+        {%- endfor %}
+    FROM amostra
+    GROUP BY mes_referencia
+)
+
+SELECT
+    mes_referencia,
+    '{{ camada }}' AS camada,
+    r.regra,
+    r.descricao,
+    r.severidade,
+    linhas_verificadas,
+    r.violacoes,
+    ROUND(r.violacoes / NULLIF(linhas_verificadas, 0), 6) AS taxa_violacao,
+    {{ amostra }} AS amostra_percentual,
+    CURRENT_TIMESTAMP AS verificado_em
+FROM agregado, UNNEST([
+    {%- for regra in regras %}
+    {'regra': '{{ regra.nome }}', 'descricao': '{{ regra.descricao | replace("'", "''") }}', 'severidade': '{{ regra.severidade }}', 'violacoes': violacoes_{{ loop.index }}}{% if not loop.last %},{% endif %}
+    {%- endfor %}
+]) AS u(r)
+ORDER BY mes_referencia, r.regra
+{% endmacro %}
+
+
+{#
+    Regras de qualidade da camada silver. Para incluir uma verificação, basta adicionar uma regra à lista:
+    o custo de cada regra é uma expressão a mais na mesma varredura.
+#}
+{% macro regras_qualidade_silver() %}
+{%- do return([
+    {'nome': 'id_nulo', 'severidade': 'error',
+     'descricao': 'Identificador do terceirizado nulo',
+     'violacao': 'id_terceirizado IS NULL'},
+    {'nome': 'id_duplicado_no_mes', 'severidade': 'error',
+     'descricao': 'Identificador do terceirizado repetido no mesmo mês de referência',
+     'agregado': 'COUNT(id_terceirizado) - COUNT(DISTINCT id_terceirizado)'},
+    {'nome': 'salario_nulo', 'severidade': 'error',
+     'descricao': 'Salário nulo ou não numérico na fonte',
+     'violacao': 'terceirizado_salario IS NULL'},
+    {'nome': 'custo_nulo', 'severidade': 'error',
+     'descricao': 'Custo nulo ou não numérico na fonte',
+     'violacao': 'terceirizado_custo IS NULL'},
+    {'nome': 'mes_carga_nulo', 'severidade': 'error',
+     'descricao': 'Mês de carga nulo ou inválido (Ano_Carga e Num_Mes_Carga)',
+     'violacao': 'mes_carga_tabela IS NULL'},
+    {'nome': 'mes_carga_diferente_referencia', 'severidade': 'error',
+     'descricao': 'Mês de carga da tabela diferente do mês de referência do arquivo',
+     'violacao': 'mes_carga_tabela != mes_referencia'},
+    {'nome': 'valor_negativo', 'severidade': 'warn',
+     'descricao': 'Salário ou custo negativo',
+     'violacao': 'terceirizado_salario < 0 OR terceirizado_custo < 0'},
+    {'nome': 'salario_maior_que_custo', 'severidade': 'warn',
+     'descricao': 'Salário maior que o custo total mensal',
+     'violacao': 'terceirizado_salario > terceirizado_custo'},
+    {'nome': 'jornada_fora_da_faixa', 'severidade': 'warn',
+     'descricao': 'Jornada semanal fora da faixa de 1 a 60 horas',
+     'violacao': 'jornada_horas NOT BETWEEN 1 AND 60'},
+    {'nome': 'cpf_formato_invalido', 'severidade': 'warn',
+     'descricao': 'CPF fora do formato 000.000.000-00, com ou sem dígitos mascarados por *',
+     'violacao': "NOT regexp_full_match(terceirizado_cpf, '[0-9*]{3}[.][0-9*]{3}[.][0-9*]{3}-[0-9*]{2}')"},
+    {'nome': 'cnpj_formato_invalido', 'severidade': 'warn',
+     'descricao': 'CNPJ fora do formato de 14 dígitos, com ou sem pontuação',
+     'violacao': "NOT regexp_full_match(empresa_cnpj, '[0-9]{14}|[0-9]{2}[.][0-9]{3}[.][0-9]{3}/[0-9]{4}-[0-9]{2}')"}
+]) -%}
+{% endmacro %}
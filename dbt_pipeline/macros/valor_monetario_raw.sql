@@ -0,0 +1,15 @@
+{#
+    Conversão dos valores monetários da camada raw para DOUBLE.
+
+    - Na camada raw, os valores são VARCHAR com vírgula decimal, como nos arquivos da CGU.
+    - Na camada raw tipada (var `raw_tipado`), já são DOUBLE, convertidos uma única vez na carga.
+      O TRY_CAST mantém a conversão válida para meses carregados na camada bronze antes da ativação.
+    As demais colunas numéricas usam TRY_CAST direto, que serve para os dois formatos.
+#}
+{% macro valor_monetario_raw(coluna) %}
+    {%- if var('raw_tipado', false) -%}
+TRY_CAST({{ coluna }} AS DOUBLE)
+    {%- else -%}
+TRY_CAST(REPLACE({{ coluna }}, ',', '.') AS DOUBLE)
+    {%- endif -%}
+{% endmacro %}
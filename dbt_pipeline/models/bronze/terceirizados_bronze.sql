@@ -6,3 +6,4 @@
 
 SELECT *
 FROM {{ source('raw', 'terceirizados_raw') }}
+{{ filtro_meses_incrementais() }}
@@ -0,0 +1,14 @@
+{{ config(
+    materialized='table',
+    post_hook=[
+        "CREATE INDEX IF NOT EXISTS idx_atual_id_terceirizado ON {{ this }} (id_terceirizado)"
+    ]
+) }}
+
+-- Snapshot atual: registros do último mês de referência da camada gold, com as mesmas colunas,
+-- para a API servir a situação vigente sem varrer os meses anteriores. Corresponde às versões
+-- abertas (valid_to nulo) de terceirizados_historico.
+SELECT *
+FROM {{ ref('terceirizados_gold') }}
+WHERE mes_referencia = (SELECT MAX(mes_referencia) FROM {{ ref('terceirizados_gold') }})
+ORDER BY orgao_superior_sigla, empresa_cnpj, id_terceirizado
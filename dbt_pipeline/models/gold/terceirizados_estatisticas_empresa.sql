@@ -0,0 +1,17 @@
+{{ config(materialized='table') }}
+
+-- Tabela de resumo recalculada a cada execução do pipeline, para consultas agregadas da API
+-- sem varrer a tabela gold completa.
+SELECT
+    mes_carga,
+    empresa_cnpj,
+    ANY_VALUE(empresa_razao_social) AS empresa_razao_social,
+    COUNT(*) AS quantidade_terceirizados,
+    COUNT(DISTINCT orgao_sigla) AS quantidade_orgaos,
+    ROUND(SUM(terceirizado_salario), 2) AS salario_total,
+    ROUND(SUM(terceirizado_custo), 2) AS custo_total,
+    ROUND(AVG(terceirizado_salario), 2) AS salario_medio,
+    ROUND(AVG(terceirizado_custo), 2) AS custo_medio
+FROM {{ ref('terceirizados_gold') }}
+GROUP BY mes_carga, empresa_cnpj
+ORDER BY mes_carga, empresa_cnpj
@@ -0,0 +1,16 @@
+{{ config(materialized='table') }}
+
+-- Tabela de resumo recalculada a cada execução do pipeline, para consultas agregadas da API
+-- sem varrer a tabela gold completa.
+SELECT
+    mes_carga,
+    orgao_sigla,
+    ANY_VALUE(orgao_nome) AS orgao_nome,
+    COUNT(*) AS quantidade_terceirizados,
+    ROUND(SUM(terceirizado_salario), 2) AS salario_total,
+    ROUND(SUM(terceirizado_custo), 2) AS custo_total,
+    ROUND(AVG(terceirizado_salario), 2) AS salario_medio,
+    ROUND(AVG(terceirizado_custo), 2) AS custo_medio
+FROM {{ ref('terceirizados_gold') }}
+GROUP BY mes_carga, orgao_sigla
+ORDER BY mes_carga, orgao_sigla
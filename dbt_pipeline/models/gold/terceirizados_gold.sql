@@ -1,7 +1,6 @@
 {{ config(
     post_hook=[
-        "CREATE INDEX IF NOT EXISTS idx_id_terceirizado ON {{ this }} (id_terceirizado);
-        CREATE INDEX IF NOT EXISTS idx_mes_carga ON {{ this }} (mes_carga)"
+        "CREATE INDEX IF NOT EXISTS idx_id_terceirizado ON {{ this }} (id_terceirizado)"
     ]
 ) }}
 
@@ -26,6 +25,13 @@ SELECT
     COALESCE(orgao_codigo_siafi, 'Não informado') AS orgao_codigo_siafi,
     COALESCE(orgao_codigo_siape, 'Não informado') AS orgao_codigo_siape,
     COALESCE(unidade_prestacao_nome, 'Não informado') AS unidade_prestacao_nome,
-    COALESCE(mes_carga_tabela, mes_referencia) AS mes_carga
+    COALESCE(mes_carga_tabela, mes_referencia) AS mes_carga,
+    mes_referencia
     
 FROM {{ ref('terceirizados_silver') }}
+{{ filtro_meses_incrementais() }}
+-- Ordenação física por mês e órgão superior: mantém as zone maps (min/max por row group) dessas colunas
+-- seletivas nos filtros da busca da API. O único índice ART é o de id_terceirizado (consultas por id):
+-- a busca da API (filtro + ORDER BY id_terceirizado LIMIT) não usa índices nas colunas filtradas, que só
+-- teriam custo de manutenção a cada delete+insert incremental e a cada delta aplicado pela API.
+ORDER BY mes_referencia, orgao_superior_sigla, empresa_cnpj, id_terceirizado
@@ -0,0 +1,132 @@
+{{ config(
+    unique_key='versao_id',
+    pre_hook=[
+        "{% if is_incremental() %}DELETE FROM {{ this }} WHERE valid_from >= {{ inicio_historico() }}{% endif %}"
+    ],
+    post_hook=[
+        "CREATE INDEX IF NOT EXISTS idx_historico_chave ON {{ this }} (chave);
+        CREATE INDEX IF NOT EXISTS idx_historico_cpf ON {{ this }} (terceirizado_cpf);
+        CREATE INDEX IF NOT EXISTS idx_historico_valid_from ON {{ this }} (valid_from)"
+    ]
+) }}
+
+-- Histórico (dimensão tipo 2) dos terceirizados por CPF e número do contrato, construído a partir dos
+-- snapshots mensais da camada gold. Cada versão vale de valid_from até valid_to (exclusivo): o mês de
+-- referência seguinte ao último em que a versão apareceu. valid_to nulo indica a versão atual.
+-- Uma nova versão começa quando o hash dos atributos muda ou quando o terceirizado volta a aparecer
+-- depois de ausente em algum mês. Execuções incrementais reprocessam apenas os meses a partir de
+-- inicio_historico, continuando as versões que estavam abertas no mês anterior.
+{%- set atributos = atributos_historico() %}
+{%- set inicio = inicio_historico() %}
+
+WITH meses AS (
+    SELECT mes_referencia, ROW_NUMBER() OVER (ORDER BY mes_referencia) AS ordem
+    FROM (SELECT DISTINCT mes_referencia FROM {{ ref('terceirizados_gold') }})
+),
+
+-- Os meses reprocessados são lidos junto com o mês anterior a eles, em que as versões já gravadas
+-- ainda abertas são retomadas
+limite AS (
+    SELECT COALESCE(MAX(mes_referencia), {{ inicio }}) AS desde
+    FROM meses
+    WHERE mes_referencia < {{ inicio }}
+),
+
+snapshots AS (
+    SELECT
+        md5(terceirizado_cpf || '|' || contrato_numero) AS chave,
+        terceirizado_cpf,
+        contrato_numero,
+        {%- for atributo in atributos %}
+        {{ atributo }},
+        {%- endfor %}
+        md5(concat_ws('|'{% for atributo in atributos %}, COALESCE(CAST({{ atributo }} AS VARCHAR), '')
+        {%- endfor %})) AS hash_atributos,
+        id_terceirizado,
+        gold.mes_referencia,
+        meses.ordem
+    FROM {{ ref('terceirizados_gold') }} AS gold
+    JOIN meses USING (mes_referencia)
+    WHERE gold.mes_referencia >= (SELECT desde FROM limite)
+    -- CPF mascarado e contrato repetidos no mesmo mês: mantém um registro por chave, de forma determinística
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY chave, gold.mes_referencia ORDER BY id_terceirizado) = 1
+),
+
+{% if is_incremental() %}
+-- Versões já gravadas que estavam abertas no mês anterior aos reprocessados: mantêm o valid_from original
+anteriores AS (
+    SELECT historico.chave, historico.valid_from
+    FROM {{ this }} AS historico, limite
+    WHERE historico.valid_from <= limite.desde
+      AND historico.ultimo_mes >= limite.desde
+),
+{% endif %}
+
+sequencia AS (
+    SELECT
+        snapshots.*,
+        {% if is_incremental() -%}
+        anteriores.valid_from AS valid_from_anterior
+        {%- else -%}
+        CAST(NULL AS DATE) AS valid_from_anterior
+        {%- endif %}
+    FROM snapshots
+    {%- if is_incremental() %}
+    CROSS JOIN limite
+    LEFT JOIN anteriores
+        ON anteriores.chave = snapshots.chave
+       AND snapshots.mes_referencia = limite.desde
+    {%- endif %}
+),
+
+marcada AS (
+    SELECT
+        *,
+        CASE
+            WHEN LAG(hash_atributos) OVER janela = hash_atributos AND LAG(ordem) OVER janela = ordem - 1 THEN 0
+            ELSE 1
+        END AS nova_versao
+    FROM sequencia
+    WINDOW janela AS (PARTITION BY chave ORDER BY ordem)
+),
+
+agrupada AS (
+    SELECT
+        *,
+        SUM(nova_versao) OVER (PARTITION BY chave ORDER BY ordem ROWS UNBOUNDED PRECEDING) AS versao
+    FROM marcada
+),
+
+versoes AS (
+    SELECT
+        chave,
+        ANY_VALUE(terceirizado_cpf) AS terceirizado_cpf,
+        ANY_VALUE(contrato_numero) AS contrato_numero,
+        {%- for atributo in atributos %}
+        ANY_VALUE({{ atributo }}) AS {{ atributo }},
+        {%- endfor %}
+        ANY_VALUE(hash_atributos) AS hash_atributos,
+        ARG_MAX(id_terceirizado, ordem) AS id_terceirizado,
+        COALESCE(MIN(valid_from_anterior), MIN(mes_referencia)) AS valid_from,
+        MAX(mes_referencia) AS ultimo_mes,
+        MAX(ordem) AS ultima_ordem
+    FROM agrupada
+    GROUP BY chave, versao
+)
+
+SELECT
+    md5(versoes.chave || '|' || CAST(versoes.valid_from AS VARCHAR)) AS versao_id,
+    versoes.chave,
+    versoes.terceirizado_cpf,
+    versoes.contrato_numero,
+    {%- for atributo in atributos %}
+    versoes.{{ atributo }},
+    {%- endfor %}
+    versoes.hash_atributos,
+    versoes.id_terceirizado,
+    versoes.valid_from,
+    proximo.mes_referencia AS valid_to,
+    versoes.ultimo_mes
+FROM versoes
+LEFT JOIN meses AS proximo ON proximo.ordem = versoes.ultima_ordem + 1
+ORDER BY versoes.valid_from, versoes.chave
@@ -0,0 +1,3 @@
+-- Relatório de violações das regras de qualidade da camada silver, uma linha por mês e regra.
+-- As regras ficam na macro regras_qualidade_silver e são verificadas em uma única varredura.
+{{ relatorio_qualidade(ref('terceirizados_silver'), 'silver', regras_qualidade_silver()) }}
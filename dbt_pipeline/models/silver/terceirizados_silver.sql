@@ -10,8 +10,8 @@ SELECT
     nm_terceirizado AS terceirizado_nome,
     nm_categoria_profissional AS terceirizado_categoria_profissional,
     nm_escolaridade AS terceirizado_escolaridade,
-    ROUND(TRY_CAST(REPLACE(vl_mensal_salario, ',', '.') AS DOUBLE), 2) AS terceirizado_salario,
-    ROUND(TRY_CAST(REPLACE(vl_mensal_custo, ',', '.') AS DOUBLE), 2) AS terceirizado_custo,
+    ROUND({{ valor_monetario_raw('vl_mensal_salario') }}, 2) AS terceirizado_salario,
+    ROUND({{ valor_monetario_raw('vl_mensal_custo') }}, 2) AS terceirizado_custo,
     TRY_CAST(nr_jornada AS INTEGER) AS jornada_horas,
     nr_cnpj AS empresa_cnpj,
     nm_razao_social AS empresa_razao_social,
@@ -28,3 +28,4 @@ SELECT
     MAKE_DATE(TRY_CAST(Ano_Carga as INTEGER), TRY_CAST(Num_Mes_Carga as INTEGER), 1) AS mes_carga_tabela,
     mes_referencia
 FROM {{ ref('terceirizados_bronze') }}
+{{ filtro_meses_incrementais() }}
@@ -1,4 +0,0 @@
-SELECT 
-    id_terceirizado
-FROM {{ ref('terceirizados_silver') }}
-WHERE mes_carga_tabela != mes_referencia
\ No newline at end of file
@@ -0,0 +1,17 @@
+-- Falha quando alguma regra de severidade 'error' dos relatórios de qualidade tem violações.
+-- Lê apenas os relatórios, já agregados por mês e regra, sem varrer novamente as camadas, e apenas os meses
+-- carregados na execução: os da var `meses_carregados` ou, sem ela, os da verificação mais recente.
+{%- set meses = var('meses_carregados', []) %}
+SELECT
+    mes_referencia,
+    camada,
+    regra,
+    violacoes
+FROM {{ ref('qualidade_silver') }}
+WHERE severidade = 'error'
+  AND violacoes > 0
+{%- if meses | length > 0 %}
+  AND mes_referencia IN ({% for mes in meses %}DATE '{{ mes }}-01'{% if not loop.last %}, {% endif %}{% endfor %})
+{%- else %}
+  AND verificado_em = (SELECT MAX(verificado_em) FROM {{ ref('qualidade_silver') }})
+{%- endif %}
@@ -1,20 +1,50 @@
 from prefect import flow, task
 from prefect.logging import get_run_logger
+from prefect.artifacts import create_table_artifact
+from prefect.runtime import flow_run
 from prefect_dbt import PrefectDbtRunner, PrefectDbtSettings
 import requests
+from requests.adapters import HTTPAdapter
 import re
 import os
 import boto3
+from boto3.s3.transfer import TransferConfig
+from s3transfer.utils import ChunksizeAdjuster
 import duckdb
 from typing import List, Literal
 from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+import codecs
+import csv
+import base64
+import datetime
+import hashlib
+import io
+import json
+import queue
+import random
+import threading
+import shutil
+import tempfile
 import time
+import urllib.parse
+import uuid
 
 #VARIÁVEIS DE AMBIENTE
 AWS_ACCESS_KEY_ID=os.environ.get('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY=os.environ.get('AWS_SECRET_ACCESS_KEY')
 AWS_REGION=os.environ.get('AWS_REGION')
 BUCKET_NAME=os.environ.get('BUCKET_NAME')
+#Endpoint S3 alternativo (ex: MinIO ou moto em http://localhost:9000). Vazio usa a AWS
+S3_ENDPOINT_URL=os.environ.get('S3_ENDPOINT_URL') or None
+#Página da CGU com os links dos arquivos de terceirizados. Pode apontar para um servidor local nos benchmarks
+URL_BASE_DADOS=os.environ.get('URL_BASE_DADOS', "https://www.gov.br/cgu/pt-br/acesso-a-informacao/dados-abertos/arquivos/terceirizados")
+URL_API=os.environ.get('URL_API', "http://fast-api:8000")
 
 #PARÂMETROS DO FLOW
 class ManualLoadParameters(BaseModel):
@@ -70,6 +100,1475 @@ class FlowParameters(BaseModel):
         description = "Comando a ser executado no DBT"
     )
 
+    perfil_dbt: Literal["dev", "performance"] = Field(
+        default = "performance",
+        title = "Perfil DBT",
+        description = "Target do profiles.yml usado pelo DBT. 'performance' ajusta threads, memória e spill em disco do DuckDB aos recursos do container"
+    )
+
+    dbt_full_refresh: bool = Field(
+        default = False,
+        title = "Reconstruir modelos DBT do zero",
+        description = "Executar o DBT com --full-refresh, reconstruindo as camadas bronze, silver e gold a partir de todos os dados brutos em vez de atualizar apenas os meses carregados"
+    )
+
+    workers_carga: int = Field(
+        default = 4,
+        ge = 1,
+        le = 16,
+        title = "Arquivos carregados em paralelo",
+        description = "Quantidade de arquivos baixados, convertidos e enviados ao S3 simultaneamente na carga de dados brutos. Use 1 para carga sequencial"
+    )
+
+    carga_streaming: bool = Field(
+        default = False,
+        title = "Carga em streaming",
+        description = "Converter os arquivos csv para parquet durante o download, sem gravar o arquivo baixado em disco. Arquivos xlsx continuam usando arquivo temporário"
+    )
+
+    linhas_por_row_group: int = Field(
+        default = 100000,
+        ge = 10000,
+        le = 1000000,
+        title = "Linhas por row group",
+        description = "Quantidade de linhas mantidas em memória antes de gravar cada row group do parquet na carga em streaming"
+    )
+
+    qualidade_amostra_percentual: int = Field(
+        default = 100,
+        ge = 1,
+        le = 100,
+        title = "Amostra da verificação de qualidade (%)",
+        description = "Percentual das linhas de cada mês verificadas pelo relatório de qualidade da camada silver. Use 100 para verificar todas as linhas"
+    )
+
+    camada_raw_tipada: bool = Field(
+        default = False,
+        title = "Camada raw tipada",
+        description = "Gravar também uma cópia tipada dos dados brutos, com números e datas convertidos na carga, ordenada por id_terc e compactada com ZSTD, e usá-la como fonte da camada bronze no DBT. Ao ativar ou desativar, rode o DBT com full refresh"
+    )
+
+#FUNÇÕES AUXILIARES DE ACESSO AO S3
+def create_s3_client():
+    """
+    Cria um cliente boto3 do S3 com as credenciais do pipeline e o endpoint de S3_ENDPOINT_URL, se definido.
+    """
+    return boto3.client('s3', 
+                  region_name=AWS_REGION, 
+                  endpoint_url=S3_ENDPOINT_URL,
+                  aws_access_key_id=AWS_ACCESS_KEY_ID,
+                  aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
+
+def s3_endpoint_settings():
+    """
+    Configurações do httpfs do DuckDB para usar o endpoint de S3_ENDPOINT_URL (URLs no estilo path).
+    Retorna dicionário vazio quando o pipeline usa a AWS.
+    """
+    if not S3_ENDPOINT_URL:
+        return {}
+    endpoint = urllib.parse.urlparse(S3_ENDPOINT_URL)
+    return {"s3_endpoint": endpoint.netloc, "s3_url_style": "path",
+            "s3_use_ssl": str(endpoint.scheme == "https").lower()}
+
+def duckdb_s3_settings():
+    """
+    Comandos SET com as credenciais e o endpoint do S3 para conexões DuckDB com httpfs.
+    """
+    settings = {"s3_region": AWS_REGION, "s3_access_key_id": AWS_ACCESS_KEY_ID,
+                "s3_secret_access_key": AWS_SECRET_ACCESS_KEY, **s3_endpoint_settings()}
+    return "\n".join(f"SET {name}='{value}';" for name, value in settings.items())
+
+def s3_filesystem():
+    """
+    Cria o sistema de arquivos S3 do pyarrow com as credenciais e o endpoint do pipeline.
+    """
+    if not S3_ENDPOINT_URL:
+        return pafs.S3FileSystem(access_key=AWS_ACCESS_KEY_ID, secret_key=AWS_SECRET_ACCESS_KEY, region=AWS_REGION)
+    endpoint = urllib.parse.urlparse(S3_ENDPOINT_URL)
+    return pafs.S3FileSystem(access_key=AWS_ACCESS_KEY_ID, secret_key=AWS_SECRET_ACCESS_KEY, region=AWS_REGION,
+                             endpoint_override=endpoint.netloc, scheme=endpoint.scheme)
+
+#MÉTRICAS DE DESEMPENHO
+METRICS_PREFIX = "terceirizados/metricas"
+
+class StageMetrics:
+    """
+    Métricas de desempenho de uma task do flow: um resumo da etapa e uma linha por item processado
+    (arquivo, modelo DBT ou camada exportada). Pode ser alimentado por várias threads ao mesmo tempo.
+
+    Ao final da task, `publish` cria um artefato de tabela no Prefect e grava as métricas em JSON no bucket,
+    em '[nome do bucket]/terceirizados/metricas/[início do flow run]_[id do flow run]/[task].json',
+    permitindo comparar o desempenho entre execuções.
+    """
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.summary = {}
+        self.items = []
+
+    def add_item(self, **fields):
+        with self._lock:
+            self.items.append(fields)
+
+    def set(self, **fields):
+        with self._lock:
+            self.summary.update(fields)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "flow_run_id": flow_run.id,
+                "etapa": self.stage,
+                "inicio": self.started_at.isoformat(timespec="seconds"),
+                "duracao_segundos": round(time.perf_counter() - self._start, 3),
+                "resumo": dict(self.summary),
+                "itens": list(self.items)
+            }
+
+    def publish(self, logger):
+        """
+        Publica as métricas como artefato do Prefect e como arquivo JSON no bucket S3.
+        Falhas na publicação são apenas registradas no log, sem interromper a task.
+        """
+        metrics = self.to_dict()
+        try:
+            create_table_artifact(
+                key=f"metricas-{self.stage.replace('_', '-')}",
+                table=metrics["itens"] or [metrics["resumo"]],
+                description=(f"### Métricas de {self.stage}\n"
+                             f"Duração: {metrics['duracao_segundos']:.1f}s\n\n"
+                             + "\n".join(f"- **{name}:** {value}" for name, value in metrics["resumo"].items()))
+            )
+            run_start = flow_run.scheduled_start_time or self.started_at
+            key = f"{METRICS_PREFIX}/{run_start:%Y%m%dT%H%M%S}_{flow_run.id}/{self.stage}.json"
+            create_s3_client().put_object(Bucket=BUCKET_NAME, Key=key, ContentType="application/json",
+                                          Body=json.dumps(metrics, indent=2, default=str).encode("utf-8"))
+            logger.info(f"Métricas de {self.stage} gravadas em s3://{BUCKET_NAME}/{key}")
+        except Exception as e:
+            logger.warning(f"Não foi possível publicar as métricas de {self.stage}: {e}")
+
+#FUNÇÕES AUXILIARES DA CARGA DE DADOS BRUTOS
+RAW_TABLE_DDL = """
+    CREATE OR REPLACE TEMP TABLE new_data (                             
+        id_terc VARCHAR,
+        sg_orgao_sup_tabela_ug VARCHAR,
+        cd_ug_gestora VARCHAR,
+        nm_ug_tabela_ug VARCHAR,
+        sg_ug_gestora VARCHAR,
+        nr_contrato VARCHAR,
+        nr_cnpj VARCHAR,
+        nm_razao_social VARCHAR,
+        nr_cpf VARCHAR,
+        nm_terceirizado VARCHAR,
+        nm_categoria_profissional VARCHAR,
+        nm_escolaridade VARCHAR,
+        nr_jornada VARCHAR,
+        nm_unidade_prestacao VARCHAR,
+        vl_mensal_salario VARCHAR,
+        vl_mensal_custo VARCHAR,
+        Num_Mes_Carga VARCHAR,
+        Mes_Carga VARCHAR,
+        Ano_Carga VARCHAR,
+        sg_orgao VARCHAR,
+        nm_orgao VARCHAR,
+        cd_orgao_siafi VARCHAR,
+        cd_orgao_siape VARCHAR,
+        mes_referencia DATE
+        );
+        """
+
+RAW_COLUMNS = [
+    "id_terc", "sg_orgao_sup_tabela_ug", "cd_ug_gestora", "nm_ug_tabela_ug", "sg_ug_gestora",
+    "nr_contrato", "nr_cnpj", "nm_razao_social", "nr_cpf", "nm_terceirizado",
+    "nm_categoria_profissional", "nm_escolaridade", "nr_jornada", "nm_unidade_prestacao",
+    "vl_mensal_salario", "vl_mensal_custo", "Num_Mes_Carga", "Mes_Carga", "Ano_Carga",
+    "sg_orgao", "nm_orgao", "cd_orgao_siafi", "cd_orgao_siape"
+]
+
+RAW_SCHEMA = pa.schema([(column, pa.string()) for column in RAW_COLUMNS] + [("mes_referencia", pa.date32())])
+
+SAMPLE_BYTES = 256 * 1024
+#Encoding da nova tentativa quando a leitura com o dialeto detectado falha: decodifica qualquer sequência de bytes
+CSV_FALLBACK_ENCODING = "latin-1"
+
+class DuckDBConnectionPool:
+    """
+    Pool de conexões DuckDB reutilizáveis na carga de dados brutos.
+
+    Todas as conexões são cursores de uma única instância DuckDB em memória, então as extensões
+    e credenciais são configuradas uma vez só e o limite de memória é compartilhado entre os arquivos
+    processados em paralelo. Cada cursor tem seu próprio schema temporário, o que isola a tabela
+    `new_data` de cada arquivo.
+    """
+    def __init__(self, size: int):
+        self._database = duckdb.connect(":memory:")
+        self._database.execute("INSTALL excel; LOAD excel;")
+        self._database.execute("INSTALL httpfs; LOAD httpfs;")
+        self._connections = queue.Queue()
+        for _ in range(size):
+            con = self._database.cursor()
+            con.execute(duckdb_s3_settings())
+            self._connections.put(con)
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão do pool, devolvendo-a ao final do bloco `with`.
+        """
+        con = self._connections.get()
+        try:
+            yield con
+        finally:
+            self._connections.put(con)
+
+    def close(self):
+        """
+        Fecha todas as conexões do pool e a instância DuckDB.
+        """
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+        self._database.close()
+
+#Requisições à fonte: tentativas, backoff exponencial com jitter (segundos), timeouts de conexão e leitura
+#e status HTTP que justificam nova tentativa. Demais erros 4xx falham na hora
+HTTP_ATTEMPTS = 5
+HTTP_BACKOFF_BASE = 1
+HTTP_BACKOFF_MAX = 60
+HTTP_TIMEOUT = (10, 120)
+HTTP_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+def create_http_session(pool_size: int):
+    """
+    Cria uma sessão HTTP compartilhada pelas requisições à fonte, que reaproveita as conexões
+    (keep-alive) entre a página índice, as requisições HEAD e os downloads.
+
+    Parâmetros:
+        pool_size (int): Conexões mantidas por host. Deve acompanhar a quantidade de downloads simultâneos.
+
+    Retorno:
+        requests.Session: Sessão HTTP.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def backoff_delay(attempt: int):
+    """
+    Espera antes da próxima tentativa: backoff exponencial com jitter completo, para que downloads
+    que falharam juntos não voltem à fonte ao mesmo tempo.
+    """
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+def retry_with_backoff(function, description: str, logger):
+    """
+    Executa `function` até HTTP_ATTEMPTS vezes, com backoff exponencial e jitter entre as tentativas.
+    Respostas HTTP de erro fora de HTTP_RETRYABLE_STATUS não são repetidas.
+
+    Parâmetros:
+        function (callable): Função sem argumentos executada a cada tentativa.
+        description (str): Descrição da operação, usada no log.
+        logger: Logger da task.
+
+    Retorno:
+        tuple: Retorno de `function` e quantidade de novas tentativas.
+    """
+    attempt=1
+    while True:
+        try:
+            return function(), attempt-1
+        except Exception as e:
+            retryable=not (isinstance(e, requests.HTTPError) and e.response is not None
+                           and e.response.status_code not in HTTP_RETRYABLE_STATUS)
+            if attempt==HTTP_ATTEMPTS or not retryable:
+                logger.error(f"Falha definitiva em {description} após {attempt} tentativa(s)")
+                raise
+            delay=backoff_delay(attempt)
+            attempt+=1
+            logger.warning(f"Falha em {description}: \n{e}\nTentando novamente em {delay:.1f}s ({attempt} de {HTTP_ATTEMPTS})...")
+            time.sleep(delay)
+
+def get_page(session: requests.Session, url: str, logger):
+    """
+    Baixa o conteúdo de uma página (ex: página índice da CGU), com novas tentativas.
+    """
+    def fetch():
+        response=session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+    return retry_with_backoff(fetch, f"acesso à página {url}", logger)[0]
+
+def if_range_validator(signature: dict):
+    """
+    Validador do cabeçalho If-Range: ETag forte ou, na falta dele, Last-Modified. Com ele, se o arquivo mudar
+    na fonte entre duas tentativas, o servidor responde com o arquivo inteiro em vez do restante.
+    """
+    etag=signature["etag"]
+    if etag and not etag.startswith("W/"):
+        return etag
+    return signature["last_modified"]
+
+def download_file(session: requests.Session, link: str, path: str, logger):
+    """
+    Faz o download de um arquivo da fonte para o caminho local informado.
+
+    Tenta até HTTP_ATTEMPTS vezes, com backoff exponencial e jitter. Uma transferência interrompida
+    continua de onde parou com uma requisição Range (e If-Range, para não juntar partes de versões
+    diferentes do arquivo). Se o servidor não aceitar Range, o download recomeça do início.
+    O tamanho final é conferido com o Content-Length (ou o total do Content-Range) informado pelo servidor.
+
+    Parâmetros:
+        session (requests.Session): Sessão HTTP compartilhada.
+        link (str): Link do arquivo na fonte.
+        path (str): Caminho local onde o arquivo será salvo.
+        logger: Logger da task.
+
+    Retorno:
+        tuple: Quantidade de bytes baixados, assinatura (ETag, Last-Modified e tamanho) do arquivo na fonte
+            e quantidade de novas tentativas.
+
+    Exceções:
+        OSError: Download incompleto em todas as tentativas.
+    """
+    state={"bytes": 0, "total": None, "signature": None}
+
+    def attempt():
+        #Sem compressão, os bytes recebidos são os do arquivo e os offsets do Range valem para eles
+        headers={"Accept-Encoding": "identity"}
+        if state["bytes"]:
+            headers["Range"]=f"bytes={state['bytes']}-"
+            validator=if_range_validator(state["signature"])
+            if validator:
+                headers["If-Range"]=validator
+        with session.get(link, stream=True, timeout=HTTP_TIMEOUT, headers=headers) as r:
+            if r.status_code==416:
+                state["bytes"]=0
+                raise OSError(f"Intervalo pedido não aceito pelo servidor (HTTP 416). Recomeçando o download")
+            r.raise_for_status()
+            content_range=re.match(r"bytes (\d+)-\d+/(\d+|\*)", r.headers.get("Content-Range", ""))
+            if r.status_code==206 and content_range and int(content_range.group(1))==state["bytes"]:
+                if content_range.group(2)!="*":
+                    state["total"]=int(content_range.group(2))
+                mode="ab"
+                logger.info(f"Retomando o download de {link} a partir de {state['bytes']/1024**2:.1f} MB")
+            else:
+                if state["bytes"]:
+                    logger.warning(f"Servidor não retomou o download de {link}. Recomeçando do início")
+                content_length=r.headers.get("Content-Length")
+                state.update(bytes=0, total=int(content_length) if content_length else None,
+                             signature=source_signature(r.headers))
+                mode="wb"
+            with open(path, mode) as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+                    state["bytes"]+=len(chunk)
+        if state["total"] is not None and state["bytes"]!=state["total"]:
+            raise OSError(f"Download incompleto: {state['bytes']} de {state['total']} bytes recebidos")
+
+    _, retries=retry_with_backoff(attempt, f"download do arquivo {link}", logger)
+    logger.info(f"Arquivo {link} baixado com sucesso")
+    return state["bytes"], state["signature"], retries
+
+def convert_file(con, path: str, filetype: str, year_month: str, dialect: dict = None, typed: bool = False):
+    """
+    Lê o arquivo baixado com DuckDB e o exporta para o bucket S3 no formato parquet,
+    na partição do mês de referência. Com `typed`, grava também a cópia tipada na camada raw tipada.
+
+    Parâmetros:
+        con: Conexão DuckDB emprestada do pool.
+        path (str): Caminho local do arquivo baixado.
+        filetype (str): Tipo do arquivo (csv ou xlsx).
+        year_month (str): Mês de referência no formato YYYY-MM.
+        dialect (dict): Encoding, delimitador e caractere de aspas do arquivo, no caso de csv.
+        typed (bool): Grava também o parquet da camada raw tipada.
+
+    Retorno:
+        tuple: Quantidade de linhas carregadas, tempo de leitura do arquivo, tempo de gravação do parquet no S3
+            e tempo de gravação do parquet tipado (segundos, None sem `typed`).
+    """
+    start = time.perf_counter()
+    con.execute(RAW_TABLE_DDL)
+    #Arquivos csv são lidos uma única vez com o dialeto já identificado (encontrados utf-8 e latin-1 na fonte)
+    csv_extra_option = ""
+    if filetype=="csv":
+        quotechar = dialect["quotechar"].replace("'", "''")
+        csv_extra_option = (f", header = true, delim = '{dialect['delimiter']}', quote = '{quotechar}', "
+                            f"encoding = '{dialect['encoding']}'")
+    con.execute(f"""
+        INSERT INTO new_data
+            SELECT 
+                *, 
+                TRY_CAST('{year_month}-01' AS DATE) AS mes_referencia
+            FROM read_{filetype}('{path}', all_varchar = true {csv_extra_option});
+                """)
+
+    rows = con.execute("SELECT COUNT(*) FROM new_data").fetchone()[0]
+    parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    con.execute(f"""
+        COPY new_data
+            TO 's3://{BUCKET_NAME}/{raw_parquet_key(year_month)}'
+            (FORMAT PARQUET, OVERWRITE)
+            """)
+    upload_seconds = time.perf_counter() - start
+    typed_seconds = None
+    if typed:
+        start = time.perf_counter()
+        write_typed_parquet(con, "new_data", year_month)
+        typed_seconds = time.perf_counter() - start
+    con.execute("DROP TABLE new_data")
+    return rows, parse_seconds, upload_seconds, typed_seconds
+
+class PrefixedStream(io.RawIOBase):
+    """
+    Stream somente leitura que devolve primeiro os bytes de amostra já lidos da resposta HTTP
+    e depois o restante da resposta, permitindo inspecionar o início do arquivo sem perder dados.
+    """
+    def __init__(self, prefix: bytes, raw):
+        self._prefix = prefix
+        self._raw = raw
+        self.bytes_read = len(prefix)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.bytes_read += n
+        return n
+
+def sniff_csv_dialect(sample: bytes):
+    """
+    Identifica encoding, delimitador e caractere de aspas de um csv a partir dos primeiros bytes do arquivo,
+    de forma que o arquivo seja lido uma única vez, já com as opções corretas.
+
+    Ordem de classificação do encoding:
+        1. BOM de UTF-16 ou UTF-8 no início do arquivo.
+        2. Sequências de bytes inválidas em UTF-8 indicam latin-1 (encontrado em arquivos antigos da fonte).
+        3. Sem sequências inválidas, UTF-8.
+
+    Parâmetros:
+        sample (bytes): Bytes iniciais do arquivo.
+
+    Retorno:
+        dict: Encoding, delimitador (delimiter) e caractere de aspas (quotechar) identificados.
+    """
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = "utf-16"
+    elif sample.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8"
+    else:
+        try:
+            #final=False ignora um caractere multibyte cortado no fim da amostra
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "latin-1"
+
+    text = sample.decode(encoding, errors="ignore").lstrip("\ufeff")
+    lines = text[:text.rfind("\n")] if "\n" in text else text
+    try:
+        dialect = csv.Sniffer().sniff(lines, delimiters=";,\t|")
+        delimiter, quotechar = dialect.delimiter, dialect.quotechar or '"'
+    except csv.Error:
+        header = lines.split("\n", 1)[0]
+        delimiter = max(";,\t|", key=header.count)
+        quotechar = '"'
+    return {"encoding": encoding, "delimiter": delimiter, "quotechar": quotechar}
+
+class S3JsonManifest:
+    """
+    Manifesto em JSON salvo no bucket S3, lido no início da task e salvo ao final.
+    O acesso é protegido por lock, já que os arquivos são processados em paralelo.
+    """
+    KEY = None
+
+    def __init__(self):
+        self._s3 = create_s3_client()
+        self._lock = threading.Lock()
+        self._changed = False
+        try:
+            body = self._s3.get_object(Bucket=BUCKET_NAME, Key=self.KEY)["Body"].read()
+            self._entries = json.loads(body)
+        except self._s3.exceptions.NoSuchKey:
+            self._entries = {}
+
+    def get(self, key: str):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            if self._entries.get(key) != value:
+                self._entries[key] = value
+                self._changed = True
+
+    def discard(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._changed = True
+
+    def is_empty(self):
+        with self._lock:
+            return not self._entries
+
+    def save(self):
+        """
+        Salva o manifesto no bucket S3, caso alguma entrada tenha sido alterada.
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            self._s3.put_object(Bucket=BUCKET_NAME, Key=self.KEY,
+                                Body=json.dumps(self._entries, indent=2, ensure_ascii=False, sort_keys=True).encode("utf-8"),
+                                ContentType="application/json")
+            self._changed = False
+
+class DialectManifest(S3JsonManifest):
+    """
+    Manifesto com o dialeto (encoding, delimitador e aspas) já detectado para cada link de arquivo csv da fonte.
+    Fica salvo no bucket S3 para que execuções futuras não precisem inspecionar novamente os mesmos arquivos.
+    """
+    KEY = "terceirizados/manifest/dialetos_csv.json"
+
+class IngestionManifest(S3JsonManifest):
+    """
+    Manifesto da carga de dados brutos, com uma entrada por mês de referência (YYYY-MM) contendo:
+    link de origem, ETag, Last-Modified e tamanho do arquivo na fonte, quantidade de linhas,
+    checksum (ETag do S3) do parquet gerado e data da carga.
+
+    Usado na busca automática de dados novos para identificar meses novos ou republicados na fonte
+    sem precisar ler os arquivos parquet já carregados.
+    """
+    KEY = "terceirizados/manifest/ingestao.json"
+
+    def record(self, year_month: str, link: str, signature: dict, rows: int = None):
+        """
+        Registra no manifesto um mês de referência carregado no bucket.
+
+        Parâmetros:
+            year_month (str): Mês de referência no formato YYYY-MM.
+            link (str): Link do arquivo na fonte.
+            signature (dict): ETag, Last-Modified e tamanho do arquivo na fonte.
+            rows (int): Quantidade de linhas carregadas. None quando o mês foi carregado antes do manifesto existir.
+
+        Retorno:
+            dict: Entrada registrada no manifesto.
+        """
+        checksum = parquet_size = None
+        if rows is not None:
+            head = self._s3.head_object(Bucket=BUCKET_NAME, Key=raw_parquet_key(year_month))
+            checksum = head["ETag"].strip('"')
+            parquet_size = head["ContentLength"]
+        entry = {
+            "url": link,
+            **signature,
+            "linhas": rows,
+            "checksum_parquet": checksum,
+            "tamanho_parquet_bytes": parquet_size,
+            "carregado_em": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        }
+        self.set(year_month, entry)
+        return entry
+
+RAW_PREFIX = "terceirizados/raw"
+#Prefixo dos parquets em gravação pelo streaming, fora da camada raw lida pelo dbt
+RAW_TEMP_PREFIX = "terceirizados/tmp/raw"
+
+def raw_parquet_key(year_month: str):
+    """
+    Retorna a chave no bucket S3 do arquivo parquet bruto de um mês de referência (YYYY-MM).
+    """
+    return f"{RAW_PREFIX}/mes_referencia={year_month}-01/terceirizados.parquet"
+
+def list_partition_files(prefix: str):
+    """
+    Lista os arquivos parquet de uma camada particionada por mes_referencia (hive) no bucket S3,
+    com uma única listagem paginada.
+
+    Parâmetros:
+        prefix (str): Prefixo da camada no bucket (ex: terceirizados/raw).
+
+    Retorno:
+        dict: Chave do arquivo por mês de referência (YYYY-MM), em ordem cronológica.
+    """
+    s3 = create_s3_client()
+    files = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=BUCKET_NAME, Prefix=f"{prefix}/"):
+        for obj in page.get("Contents", []):
+            match = re.search(r"/mes_referencia=(\d{4}-\d{2})-01/[^/]+\.parquet$", obj["Key"])
+            if match:
+                files[match.group(1)] = obj["Key"]
+    return dict(sorted(files.items()))
+
+#Camada raw tipada: mesmas colunas da camada raw, com números e datas convertidos uma única vez na carga
+TYPED_RAW_PREFIX = "terceirizados/raw_tipado"
+TYPED_ROW_GROUP_ROWS = 245760
+TYPED_RAW_SELECT = """
+    SELECT
+        TRY_CAST(id_terc AS INTEGER) AS id_terc,
+        sg_orgao_sup_tabela_ug,
+        cd_ug_gestora,
+        nm_ug_tabela_ug,
+        sg_ug_gestora,
+        nr_contrato,
+        nr_cnpj,
+        nm_razao_social,
+        nr_cpf,
+        nm_terceirizado,
+        nm_categoria_profissional,
+        nm_escolaridade,
+        TRY_CAST(nr_jornada AS INTEGER) AS nr_jornada,
+        nm_unidade_prestacao,
+        TRY_CAST(REPLACE(vl_mensal_salario, ',', '.') AS DOUBLE) AS vl_mensal_salario,
+        TRY_CAST(REPLACE(vl_mensal_custo, ',', '.') AS DOUBLE) AS vl_mensal_custo,
+        TRY_CAST(Num_Mes_Carga AS INTEGER) AS Num_Mes_Carga,
+        Mes_Carga,
+        TRY_CAST(Ano_Carga AS INTEGER) AS Ano_Carga,
+        sg_orgao,
+        nm_orgao,
+        cd_orgao_siafi,
+        cd_orgao_siape,
+        mes_referencia
+"""
+
+def typed_parquet_key(year_month: str):
+    """
+    Retorna a chave no bucket S3 do arquivo parquet tipado de um mês de referência (YYYY-MM).
+    """
+    return f"{TYPED_RAW_PREFIX}/mes_referencia={year_month}-01/terceirizados.parquet"
+
+def write_typed_parquet(con, source: str, year_month: str):
+    """
+    Grava no bucket S3 o parquet tipado de um mês de referência a partir dos dados brutos (todas as colunas VARCHAR).
+
+    Os valores são convertidos uma única vez, as linhas são ordenadas por id_terc, o que deixa as estatísticas
+    de cada row group seletivas para filtros por id, e o arquivo é compactado com ZSTD. Colunas de baixa
+    cardinalidade, como sg_orgao e nm_escolaridade, são gravadas com dicionário pelo DuckDB.
+
+    Parâmetros:
+        con: Conexão DuckDB com httpfs e credenciais do S3.
+        source (str): Tabela ou expressão de leitura dos dados brutos (ex: new_data ou read_parquet(...)).
+        year_month (str): Mês de referência no formato YYYY-MM.
+    """
+    con.execute(f"""
+        COPY ({TYPED_RAW_SELECT} FROM {source} ORDER BY id_terc)
+            TO 's3://{BUCKET_NAME}/{typed_parquet_key(year_month)}'
+            (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {TYPED_ROW_GROUP_ROWS}, OVERWRITE)
+            """)
+
+def months_without_typed_parquet():
+    """
+    Lista os meses de referência (YYYY-MM) presentes na camada raw e ausentes da camada raw tipada,
+    como os carregados antes de a camada tipada ser ativada.
+    """
+    typed = list_partition_files(TYPED_RAW_PREFIX)
+    return [month for month in list_partition_files(RAW_PREFIX) if month not in typed]
+
+def backfill_typed_parquet(pool: DuckDBConnectionPool, year_month: str, logger):
+    """
+    Grava o parquet tipado de um mês de referência já carregado, lendo o parquet da camada raw no bucket S3.
+    """
+    start = time.perf_counter()
+    with pool.connection() as con:
+        write_typed_parquet(con, f"read_parquet('s3://{BUCKET_NAME}/{raw_parquet_key(year_month)}')", year_month)
+    logger.info(f"Parquet tipado de {year_month} gravado a partir da camada raw em {time.perf_counter()-start:.1f}s")
+    return year_month
+
+def source_signature(headers):
+    """
+    Extrai dos cabeçalhos HTTP de um arquivo da fonte os campos usados para detectar alterações.
+    """
+    content_length = headers.get("Content-Length")
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "tamanho_bytes": int(content_length) if content_length else None
+    }
+
+def head_source_file(session: requests.Session, link: str, logger):
+    """
+    Faz requisição HEAD de um arquivo da fonte e retorna sua assinatura (ETag, Last-Modified e tamanho).
+    Em caso de falha (ex: timeout ou erro 5xx), registra um aviso e retorna None: a assinatura é desconhecida.
+    """
+    try:
+        response = session.head(link, allow_redirects=True, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return source_signature(response.headers)
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Falha na requisição HEAD de {link}: {e}")
+        return None
+
+def source_file_changed(entry: dict, link: str, signature: dict):
+    """
+    Compara a assinatura atual de um arquivo da fonte com a registrada no manifesto.
+    Só são comparados os campos disponíveis nas duas assinaturas. Sem nenhum campo comparável,
+    o arquivo é considerado inalterado.
+
+    Retorno:
+        bool: True se o link mudou ou se algum campo comparável for diferente.
+    """
+    if entry.get("url") != link:
+        return True
+    for field in ["etag", "last_modified", "tamanho_bytes"]:
+        if entry.get(field) is not None and signature.get(field) is not None and entry[field] != signature[field]:
+            return True
+    return False
+
+def get_last_loaded_month(logger):
+    """
+    Busca o último mês de referência já carregado na camada raw do bucket S3.
+
+    O mês é lido do nome do diretório de cada partição (mes_referencia=YYYY-MM-DD), com uma única
+    listagem do S3 e sem abrir os arquivos parquet.
+
+    Retorno:
+        int: Último mês carregado (YYYYMM) ou None se não houver dados ou a busca falhar.
+    """
+    try:
+        with duckdb.connect() as con:
+            con.execute("INSTALL httpfs; LOAD httpfs;")
+            con.execute(duckdb_s3_settings())
+            max_month_result=con.sql(f"""
+                SELECT MAX(regexp_extract(file, 'mes_referencia=(\\d{{4}}-\\d{{2}}-\\d{{2}})/', 1))::DATE
+                FROM glob('s3://{BUCKET_NAME}/{RAW_PREFIX}/*/*.parquet')
+                """).fetchone()
+            if max_month_result and max_month_result[0]:
+                max_month = max_month_result[0]
+                return int(f"{max_month.year}{max_month.month:02d}")
+    except Exception as e:
+        logger.warning(f"Erro de conexão com o banco na busca da última atualização: {e}")
+    return None
+
+def find_new_or_changed_files(session: requests.Session, files: list, ingestion_manifest: IngestionManifest,
+                              dialect_manifest: DialectManifest, workers: int, logger):
+    """
+    Seleciona os arquivos da fonte que precisam ser carregados: meses ainda não registrados no manifesto
+    de ingestão ou meses republicados na fonte (ETag, Last-Modified ou tamanho diferentes).
+    A verificação usa apenas requisições HEAD, sem baixar os arquivos nem ler os parquets do bucket.
+
+    Se o manifesto ainda não existir, os meses até o último mês já carregado no bucket são registrados
+    como carregados, sem recarga.
+
+    Um mês já registrado cuja requisição HEAD falhou não é considerado alterado nem inalterado: ele não
+    é carregado e o manifesto não muda, de forma que a verificação é repetida na execução seguinte.
+    Na criação do manifesto, meses sem assinatura não são registrados e são carregados novamente.
+
+    Parâmetros:
+        session (requests.Session): Sessão HTTP compartilhada.
+        files (list): Arquivos da fonte (link, tipo e ano-mês YYYYMM).
+        ingestion_manifest (IngestionManifest): Manifesto de ingestão.
+        dialect_manifest (DialectManifest): Manifesto de dialetos. Dialetos de arquivos alterados são descartados.
+        workers (int): Quantidade de requisições HEAD simultâneas.
+        logger: Logger da task.
+
+    Retorno:
+        list: Arquivos novos ou alterados.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        signatures = list(executor.map(lambda file: head_source_file(session, file[0], logger), files))
+
+    if ingestion_manifest.is_empty():
+        last_month = get_last_loaded_month(logger)
+        logger.info(f"Manifesto de ingestão não encontrado. Registrando meses já carregados até {last_month}")
+        if last_month:
+            for file, signature in zip(files, signatures):
+                if int(file[2]) <= last_month and signature is not None:
+                    ingestion_manifest.record(file[2][:4] + '-' + file[2][4:], file[0], signature)
+
+    changed_files = []
+    for file, signature in zip(files, signatures):
+        year_month = file[2][:4] + '-' + file[2][4:]
+        entry = ingestion_manifest.get(year_month)
+        if entry is None:
+            logger.info(f"Mês {year_month} ainda não carregado")
+            changed_files.append(file)
+        elif signature is None and entry.get("url") == file[0]:
+            logger.warning(f"Não foi possível verificar se o arquivo de {year_month} foi alterado na fonte. "
+                           "A verificação será repetida na próxima execução")
+        elif source_file_changed(entry, file[0], signature or source_signature({})):
+            logger.info(f"Arquivo de {year_month} foi alterado na fonte desde a última carga:\n -Antes: {entry}\n -Agora: {signature}")
+            dialect_manifest.discard(file[0])
+            changed_files.append(file)
+    return changed_files
+
+def get_csv_dialect(manifest: DialectManifest, link: str, sample: bytes, year_month: str, logger):
+    """
+    Retorna o dialeto do csv salvo no manifesto ou, se o link ainda não estiver nele, detecta a partir da amostra.
+    O dialeto detectado só é registrado no manifesto depois que o arquivo é lido com sucesso.
+
+    Parâmetros:
+        manifest (DialectManifest): Manifesto de dialetos.
+        link (str): Link do arquivo na fonte.
+        sample (bytes): Bytes iniciais do arquivo.
+        year_month (str): Mês de referência no formato YYYY-MM.
+        logger: Logger da task.
+
+    Retorno:
+        dict: Encoding, delimitador e caractere de aspas do arquivo.
+    """
+    dialect = manifest.get(link)
+    if dialect:
+        logger.info(f"Dialeto do csv de {year_month} encontrado no manifesto: {dialect}")
+        return dialect
+    dialect = sniff_csv_dialect(sample)
+    logger.info(f"Dialeto detectado no csv de {year_month}: {dialect}")
+    return dialect
+
+def fallback_dialect(manifest: DialectManifest, link: str, dialect: dict, year_month: str, error: Exception, logger):
+    """
+    Descarta do manifesto o dialeto de um csv cuja leitura falhou, para que ele seja detectado novamente
+    na próxima execução, e retorna o mesmo dialeto com encoding latin-1 para uma nova tentativa.
+    Uma amostra só com caracteres ASCII é classificada como utf-8 mesmo em arquivos latin-1.
+
+    Parâmetros:
+        manifest (DialectManifest): Manifesto de dialetos.
+        link (str): Link do arquivo na fonte.
+        dialect (dict): Dialeto usado na leitura que falhou.
+        year_month (str): Mês de referência no formato YYYY-MM.
+        error (Exception): Erro da leitura.
+        logger: Logger da task.
+
+    Retorno:
+        dict: Dialeto com encoding latin-1, ou None se a leitura que falhou já usava latin-1.
+    """
+    manifest.discard(link)
+    if dialect["encoding"] == CSV_FALLBACK_ENCODING:
+        return None
+    logger.warning(f"Falha ao ler o csv de {year_month} com o dialeto {dialect}: \n{error}\n"
+                   f"Tentando novamente com encoding {CSV_FALLBACK_ENCODING}...")
+    return {**dialect, "encoding": CSV_FALLBACK_ENCODING}
+
+def stream_csv_to_parquet(session: requests.Session, link: str, year_month: str, row_group_rows: int,
+                          manifest: DialectManifest, logger, dialect: dict = None):
+    """
+    Converte um csv para parquet durante o download, enviando o resultado direto para o bucket S3.
+
+    A resposta HTTP é lida em blocos pelo leitor de csv do pyarrow e as linhas são acumuladas até
+    `row_group_rows`, quando são gravadas como um row group no upload multipart do S3. O uso de memória
+    fica limitado ao tamanho do row group e nada é gravado em disco. Como o parquet é gerado durante
+    a leitura, uma falha recomeça o arquivo do início. A quantidade de bytes lidos é conferida com o
+    Content-Length informado pelo servidor.
+
+    O parquet é gravado em uma chave temporária (RAW_TEMP_PREFIX) e só é movido para a partição do mês
+    depois da leitura completa. Em caso de erro, a chave temporária é apagada e a partição do mês
+    não é alterada, já que o fechamento do writer conclui o upload multipart mesmo com a leitura incompleta.
+
+    Parâmetros:
+        session (requests.Session): Sessão HTTP compartilhada.
+        link (str): Link do arquivo na fonte.
+        year_month (str): Mês de referência no formato YYYY-MM.
+        row_group_rows (int): Quantidade de linhas por row group.
+        manifest (DialectManifest): Manifesto de dialetos dos arquivos csv. O dialeto é registrado nele
+            depois de uma leitura completa.
+        logger: Logger da task.
+        dialect (dict): Dialeto a usar em vez do salvo no manifesto ou detectado (nova tentativa com latin-1).
+
+    Retorno:
+        tuple: Quantidade de bytes baixados, quantidade de linhas gravadas e assinatura do arquivo na fonte.
+    """
+    s3 = s3_filesystem()
+    s3_path = f"{BUCKET_NAME}/{raw_parquet_key(year_month)}"
+    reference_month = datetime.date.fromisoformat(f"{year_month}-01")
+
+    temp_path = f"{BUCKET_NAME}/{RAW_TEMP_PREFIX}/{uuid.uuid4().hex}.parquet"
+    retry_dialect = None
+    moved = False
+    try:
+        with session.get(link, stream=True, timeout=HTTP_TIMEOUT, headers={"Accept-Encoding": "identity"}) as r:
+            r.raise_for_status()
+            signature = source_signature(r.headers)
+            r.raw.decode_content = True
+            sample = b""
+            if dialect is None:
+                sample = b"" if manifest.get(link) else r.raw.read(SAMPLE_BYTES)
+                dialect = get_csv_dialect(manifest, link, sample, year_month, logger)
+
+            stream = PrefixedStream(sample, r.raw)
+            rows = 0
+            try:
+                reader = pacsv.open_csv(
+                    io.BufferedReader(stream, buffer_size=1024 * 1024),
+                    read_options=pacsv.ReadOptions(column_names=RAW_COLUMNS, skip_rows=1, encoding=dialect["encoding"]),
+                    parse_options=pacsv.ParseOptions(delimiter=dialect["delimiter"], quote_char=dialect["quotechar"],
+                                                     newlines_in_values=True),
+                    convert_options=pacsv.ConvertOptions(column_types={column: pa.string() for column in RAW_COLUMNS})
+                )
+                with s3.open_output_stream(temp_path) as sink, pq.ParquetWriter(sink, RAW_SCHEMA) as writer:
+                    buffer = []
+                    buffered_rows = 0
+                    for batch in reader:
+                        months = pa.array([reference_month] * batch.num_rows, type=pa.date32())
+                        buffer.append(pa.RecordBatch.from_arrays(batch.columns + [months], schema=RAW_SCHEMA))
+                        buffered_rows += batch.num_rows
+                        if buffered_rows >= row_group_rows:
+                            table = pa.Table.from_batches(buffer, schema=RAW_SCHEMA)
+                            writer.write_table(table.slice(0, row_group_rows), row_group_size=row_group_rows)
+                            remainder = table.slice(row_group_rows)
+                            buffer = remainder.to_batches()
+                            buffered_rows = remainder.num_rows
+                            rows += row_group_rows
+                    if buffered_rows:
+                        writer.write_table(pa.Table.from_batches(buffer, schema=RAW_SCHEMA), row_group_size=row_group_rows)
+                        rows += buffered_rows
+            except pa.ArrowInvalid as e:
+                #Erro de decodificação ou de parse: o arquivo é lido de novo, do início, com latin-1
+                retry_dialect = fallback_dialect(manifest, link, dialect, year_month, e, logger)
+                if retry_dialect is None:
+                    raise
+
+        if not retry_dialect:
+            if signature["tamanho_bytes"] is not None and stream.bytes_read != signature["tamanho_bytes"]:
+                raise OSError(f"Download incompleto: {stream.bytes_read} de {signature['tamanho_bytes']} bytes recebidos")
+            s3.move(temp_path, s3_path)
+            moved = True
+    finally:
+        if not moved:
+            try:
+                s3.delete_file(temp_path)
+            except OSError:
+                pass
+
+    if retry_dialect:
+        return stream_csv_to_parquet(session, link, year_month, row_group_rows, manifest, logger, retry_dialect)
+
+    manifest.set(link, dialect)
+    return stream.bytes_read, rows, signature
+
+def process_file(pool: DuckDBConnectionPool, session: requests.Session, manifest: DialectManifest, file: tuple,
+                 temp_dir: str, logger, streaming: bool = False, row_group_rows: int = 100000, typed: bool = False):
+    """
+    Baixa, converte e envia para o S3 um arquivo da fonte, registrando os tempos de cada etapa.
+    O download acontece fora do pool de conexões, de forma que downloads de uns arquivos
+    ocorrem ao mesmo tempo que a conversão e o envio de outros.
+
+    Parâmetros:
+        pool (DuckDBConnectionPool): Pool de conexões DuckDB.
+        session (requests.Session): Sessão HTTP compartilhada pelos downloads.
+        manifest (DialectManifest): Manifesto de dialetos dos arquivos csv.
+        file (tuple): Link, tipo e ano-mês (YYYYMM) do arquivo.
+        temp_dir (str): Diretório temporário exclusivo da execução da task.
+        logger: Logger da task.
+        streaming (bool): Converte arquivos csv durante o download, sem arquivo temporário.
+        row_group_rows (int): Quantidade de linhas por row group na conversão em streaming.
+        typed (bool): Grava também o parquet da camada raw tipada.
+
+    Retorno:
+        dict: Mês de referência carregado (YYYY-MM), link, assinatura do arquivo na fonte, quantidade de linhas
+            e métricas de desempenho de cada etapa.
+    """
+    link=file[0]
+    filetype=file[1]
+    year_month=file[2][:4] + '-' + file[2][4:]
+    temp_path=os.path.join(temp_dir, f"{year_month}.{filetype}")
+
+    #Arquivos xlsx precisam de acesso aleatório para leitura e sempre passam pelo arquivo temporário
+    if streaming and filetype=="csv":
+        logger.info(f"Baixando e convertendo em streaming o arquivo de {year_month}:\n -Link: {link}")
+        start=time.perf_counter()
+        (downloaded_bytes, rows, signature), retries=retry_with_backoff(
+            lambda: stream_csv_to_parquet(session, link, year_month, row_group_rows, manifest, logger),
+            f"carga em streaming do arquivo {link}", logger)
+        total_time=time.perf_counter()-start
+        logger.info(f"Dados de {year_month} carregados com sucesso no bucket\n"
+                    f" -Download, conversão e envio: {downloaded_bytes/1024**2:.1f} MB e {rows} linhas em {total_time:.1f}s")
+        typed_time=None
+        if typed:
+            #O csv não fica em disco: o parquet tipado é gerado a partir do parquet bruto recém-enviado
+            start=time.perf_counter()
+            with pool.connection() as con:
+                write_typed_parquet(con, f"read_parquet('s3://{BUCKET_NAME}/{raw_parquet_key(year_month)}')", year_month)
+            typed_time=time.perf_counter()-start
+            total_time+=typed_time
+        metrics={"modo": "streaming", "bytes_baixados": downloaded_bytes, "download_segundos": None,
+                 "leitura_segundos": None, "envio_segundos": None,
+                 "tipagem_segundos": round(typed_time, 3) if typed else None, "total_segundos": round(total_time, 3),
+                 "mb_por_segundo": round(downloaded_bytes/1024**2/total_time, 2) if total_time else None,
+                 "linhas_por_segundo": round(rows/total_time) if total_time else None, "tentativas_extras": retries}
+        return {"year_month": year_month, "link": link, "signature": signature, "rows": rows, "metrics": metrics}
+
+    logger.info(f"Baixando arquivo de {year_month}:\n -Tipo do arquivo: {filetype}\n -Link: {link}")
+    start=time.perf_counter()
+    downloaded_bytes, signature, retries=download_file(session, link, temp_path, logger)
+    download_time=time.perf_counter()-start
+
+    logger.info(f"Enviando arquivo de {year_month} para bucket '{BUCKET_NAME}' na AWS S3")
+    start=time.perf_counter()
+    try:
+        dialect=None
+        if filetype=="csv":
+            with open(temp_path, "rb") as f:
+                dialect=get_csv_dialect(manifest, link, f.read(SAMPLE_BYTES), year_month, logger)
+        with pool.connection() as con:
+            try:
+                rows, parse_time, upload_time, typed_time=convert_file(con, temp_path, filetype, year_month, dialect, typed)
+            except duckdb.InvalidInputException as e:
+                #Erro de decodificação ou de parse do csv: nova leitura com latin-1
+                if filetype!="csv" or (dialect:=fallback_dialect(manifest, link, dialect, year_month, e, logger)) is None:
+                    raise
+                rows, parse_time, upload_time, typed_time=convert_file(con, temp_path, filetype, year_month, dialect, typed)
+        if dialect:
+            manifest.set(link, dialect)
+    finally:
+        os.remove(temp_path)
+    convert_time=time.perf_counter()-start
+
+    logger.info(f"Dados de {year_month} carregados com sucesso no bucket\n"
+                f" -Download: {downloaded_bytes/1024**2:.1f} MB em {download_time:.1f}s\n"
+                f" -Conversão e envio: {rows} linhas em {convert_time:.1f}s")
+    metrics={"modo": "arquivo temporário", "bytes_baixados": downloaded_bytes, "download_segundos": round(download_time, 3),
+             "leitura_segundos": round(parse_time, 3), "envio_segundos": round(upload_time, 3),
+             "tipagem_segundos": round(typed_time, 3) if typed else None, "total_segundos": round(download_time+convert_time, 3),
+             "mb_por_segundo": round(downloaded_bytes/1024**2/download_time, 2) if download_time else None,
+             "linhas_por_segundo": round(rows/parse_time) if parse_time else None, "tentativas_extras": retries}
+    return {"year_month": year_month, "link": link, "signature": signature, "rows": rows, "metrics": metrics}
+
+#FUNÇÕES AUXILIARES DO DBT
+DBT_PROJECT_DIR = "dbt_pipeline"
+
+#Tabelas exportadas no arquivo DuckDB de cada camada
+LAYER_TABLES = {
+    "bronze": ["terceirizados_bronze"],
+    "silver": ["terceirizados_silver", "qualidade_silver"],
+    "gold": [
+        "terceirizados_gold",
+        "terceirizados_estatisticas_orgao",
+        "terceirizados_estatisticas_empresa",
+        "terceirizados_estatisticas_mes",
+        "terceirizados_atual"
+    ],
+    "historico": ["terceirizados_historico"]
+}
+DUCKDB_TEMP_DIRECTORY = "/tmp/duckdb_spill"
+
+def container_resources():
+    """
+    Identifica a quantidade de núcleos e a memória disponíveis para o container,
+    respeitando os limites de cgroup (v2 ou v1) quando existirem.
+
+    Retorno:
+        tuple: Quantidade de núcleos e memória disponível em bytes.
+    """
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in ["/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"]:
+        try:
+            with open(path) as f:
+                limit = f.read().strip()
+            if limit != "max":
+                memory = min(memory, int(limit))
+            break
+        except (OSError, ValueError):
+            continue
+    return cpus, memory
+
+def configure_dbt_resources(logger):
+    """
+    Define as variáveis de ambiente lidas pelo target 'performance' do profiles.yml:
+        - DBT_THREADS e DUCKDB_THREADS: núcleos disponíveis no container.
+        - DUCKDB_MEMORY_LIMIT: 70% da memória do container, deixando margem para o Python, o DBT e o Prefect.
+        - DUCKDB_TEMP_DIRECTORY: diretório de spill em disco para operadores que não cabem em memória.
+    """
+    cpus, memory = container_resources()
+    memory_limit_mb = int(memory * 0.7 / 1024**2)
+    os.makedirs(DUCKDB_TEMP_DIRECTORY, exist_ok=True)
+    os.environ["DBT_THREADS"] = str(cpus)
+    os.environ["DUCKDB_THREADS"] = str(cpus)
+    os.environ["DUCKDB_MEMORY_LIMIT"] = f"{memory_limit_mb}MB"
+    os.environ["DUCKDB_TEMP_DIRECTORY"] = DUCKDB_TEMP_DIRECTORY
+    logger.info(f"Recursos do container: {cpus} núcleos e {memory/1024**3:.1f} GB de memória\n"
+                f" -Threads DBT/DuckDB: {cpus}\n"
+                f" -memory_limit do DuckDB: {memory_limit_mb} MB\n"
+                f" -Spill em disco: {DUCKDB_TEMP_DIRECTORY}")
+
+def directory_size(path: str):
+    """
+    Retorna o tamanho em bytes dos arquivos de um diretório (sem subdiretórios).
+    """
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    except OSError:
+        return 0
+
+class ResourceSampler:
+    """
+    Amostra em segundo plano a memória residente do processo e o tamanho do diretório de spill do DuckDB
+    enquanto o DBT roda, para atribuir picos de uso a cada modelo a partir dos horários em run_results.json.
+
+    O DBT e o DuckDB rodam no mesmo processo da task, então a memória residente do processo inclui
+    o buffer do DuckDB. Com mais de uma thread no DBT, modelos simultâneos compartilham o mesmo pico.
+    """
+    def __init__(self, interval: float = 0.2, spill_dir: str = DUCKDB_TEMP_DIRECTORY):
+        self._interval = interval
+        self._spill_dir = spill_dir
+        self._samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        while not self._stop.is_set():
+            with open("/proc/self/statm") as f:
+                rss = int(f.read().split()[1]) * page_size
+            self._samples.append((time.time(), rss, directory_size(self._spill_dir)))
+            self._stop.wait(self._interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def peak_between(self, start: float, end: float):
+        """
+        Retorna os picos de memória residente e de spill em disco (bytes) entre dois instantes (epoch).
+        """
+        window = [sample for sample in self._samples if start <= sample[0] <= end]
+        if not window:
+            return None, None
+        return max(sample[1] for sample in window), max(sample[2] for sample in window)
+
+def count_model_rows(models: list):
+    """
+    Conta as linhas de cada modelo no banco local do DBT. Modelos sem tabela (ex: testes) ficam com None.
+    """
+    counts = {}
+    try:
+        with duckdb.connect("local.duckdb", read_only=True) as con:
+            for model in models:
+                try:
+                    counts[model] = con.execute(f"SELECT COUNT(*) FROM {model}").fetchone()[0]
+                except duckdb.Error:
+                    counts[model] = None
+    except duckdb.Error:
+        pass
+    return counts
+
+def report_dbt_models(sampler: ResourceSampler, logger):
+    """
+    Lê o run_results.json da última execução do DBT e registra no log o tempo de execução,
+    a quantidade de linhas e os picos de memória e de spill de cada modelo.
+
+    Retorno:
+        list: Métricas de cada nó executado pelo DBT (modelos e testes).
+    """
+    try:
+        with open(os.path.join(DBT_PROJECT_DIR, "target", "run_results.json")) as f:
+            run_results = json.load(f)
+    except OSError as e:
+        logger.warning(f"Não foi possível ler run_results.json do DBT: {e}")
+        return []
+
+    results = run_results.get("results", [])
+    rows = count_model_rows([result["unique_id"].split(".")[-1] for result in results
+                             if result["unique_id"].startswith("model.")])
+    lines = []
+    items = []
+    for result in results:
+        timing = {t["name"]: t for t in result.get("timing", [])}
+        execute = timing.get("execute")
+        peak_rss = peak_spill = None
+        if execute and execute.get("started_at") and execute.get("completed_at"):
+            started = datetime.datetime.fromisoformat(execute["started_at"].replace("Z", "+00:00")).timestamp()
+            completed = datetime.datetime.fromisoformat(execute["completed_at"].replace("Z", "+00:00")).timestamp()
+            peak_rss, peak_spill = sampler.peak_between(started, completed)
+        memory = f"{peak_rss/1024**2:.0f} MB" if peak_rss is not None else "-"
+        spill = f"{peak_spill/1024**2:.0f} MB" if peak_spill is not None else "-"
+        model_rows = rows.get(result["unique_id"].split(".")[-1])
+        lines.append(f" -{result['unique_id']}: {result['status']} em {result['execution_time']:.1f}s | "
+                     f"{model_rows if model_rows is not None else '-'} linhas | "
+                     f"pico de memória {memory} | pico de spill {spill}")
+        items.append({
+            "no": result["unique_id"],
+            "status": result["status"],
+            "duracao_segundos": round(result["execution_time"], 3),
+            "linhas": model_rows,
+            "linhas_afetadas": (result.get("adapter_response") or {}).get("rows_affected"),
+            "pico_memoria_bytes": peak_rss,
+            "pico_spill_bytes": peak_spill
+        })
+    logger.info("Desempenho dos modelos DBT:\n" + "\n".join(lines))
+    return items
+
+def report_data_quality(logger):
+    """
+    Resume no log o relatório de qualidade da camada silver (modelo qualidade_silver) da última verificação:
+    as regras com violações, por severidade.
+
+    Retorno:
+        dict: Quantidade de violações de regras 'error' e 'warn' da última verificação.
+    """
+    try:
+        with duckdb.connect("local.duckdb", read_only=True) as con:
+            violations = con.execute("""
+                SELECT regra, severidade, SUM(violacoes), MAX(taxa_violacao), LIST(DISTINCT mes_referencia ORDER BY mes_referencia)
+                FROM qualidade_silver
+                WHERE verificado_em = (SELECT MAX(verificado_em) FROM qualidade_silver)
+                  AND violacoes > 0
+                GROUP BY regra, severidade
+                ORDER BY severidade, regra
+                """).fetchall()
+    except duckdb.Error as e:
+        logger.warning(f"Não foi possível ler o relatório de qualidade da camada silver: {e}")
+        return {}
+    totals = {"error": 0, "warn": 0}
+    for regra, severidade, violacoes, taxa, meses in violations:
+        totals[severidade] = totals.get(severidade, 0) + violacoes
+        (logger.error if severidade == "error" else logger.warning)(
+            f"Qualidade da camada silver: regra {regra} com {violacoes} violações "
+            f"(taxa máxima {taxa:.2%}) nos meses {', '.join(str(mes) for mes in meses)}")
+    return {"qualidade_violacoes_erro": totals["error"], "qualidade_violacoes_aviso": totals["warn"]}
+
+#FUNÇÕES AUXILIARES DA CARGA DE DADOS TRANSFORMADOS
+GOLD_SNAPSHOT_PREFIX = "terceirizados/gold/snapshot"
+GOLD_SNAPSHOT_MANIFEST_KEY = f"{GOLD_SNAPSHOT_PREFIX}/manifest.json"
+
+#Envio multipart dos arquivos DuckDB das camadas: partes de 64 MB enviadas em paralelo
+UPLOAD_PART_SIZE = 64 * 1024**2
+UPLOAD_TRANSFER_CONFIG = TransferConfig(multipart_threshold=UPLOAD_PART_SIZE, multipart_chunksize=UPLOAD_PART_SIZE,
+                                        max_concurrency=8, use_threads=True)
+
+def file_sha256(path: str):
+    """
+    Calcula o SHA-256 (hexadecimal) de um arquivo local, lendo em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def expected_s3_checksum(path: str, config: TransferConfig = UPLOAD_TRANSFER_CONFIG):
+    """
+    Calcula localmente o ChecksumSHA256 que o S3 deve registrar para o arquivo enviado com `upload_file`
+    e ChecksumAlgorithm SHA256: o SHA-256 do arquivo em base64 ou, no envio multipart, o SHA-256 da
+    concatenação dos SHA-256 de cada parte seguido de `-<quantidade de partes>`.
+
+    Parâmetros:
+        path (str): Caminho do arquivo local.
+        config (TransferConfig): Configuração de envio usada no upload (limite e tamanho das partes).
+
+    Retorno:
+        str: Checksum esperado no formato retornado por head_object.
+    """
+    size = os.path.getsize(path)
+    if size < config.multipart_threshold:
+        return base64.b64encode(bytes.fromhex(file_sha256(path))).decode()
+    part_size = ChunksizeAdjuster().adjust_chunksize(config.multipart_chunksize, size)
+    parts = []
+    with open(path, "rb") as f:
+        for part in iter(lambda: f.read(part_size), b""):
+            parts.append(hashlib.sha256(part).digest())
+    return f"{base64.b64encode(hashlib.sha256(b''.join(parts)).digest()).decode()}-{len(parts)}"
+
+def upload_verified(s3, path: str, key: str):
+    """
+    Envia um arquivo ao bucket S3 em partes paralelas (UPLOAD_TRANSFER_CONFIG) com checksum SHA-256,
+    validado pelo S3 a cada parte, e confere o checksum e o tamanho do objeto gravado com os do arquivo local.
+
+    Parâmetros:
+        s3: Cliente boto3 do S3, compartilhado entre as threads.
+        path (str): Caminho do arquivo local.
+        key (str): Chave do objeto no bucket.
+
+    Retorno:
+        str: Checksum SHA-256 do objeto no S3.
+
+    Exceções:
+        ValueError: O objeto gravado no S3 não confere com o arquivo local.
+    """
+    s3.upload_file(path, BUCKET_NAME, key, ExtraArgs={"ChecksumAlgorithm": "SHA256"}, Config=UPLOAD_TRANSFER_CONFIG)
+    expected = expected_s3_checksum(path)
+    head = s3.head_object(Bucket=BUCKET_NAME, Key=key, ChecksumMode="ENABLED")
+    #Alguns serviços compatíveis com S3 omitem o sufixo com a quantidade de partes do checksum multipart
+    if (head.get("ChecksumSHA256") or "").split("-")[0] != expected.split("-")[0] or head["ContentLength"] != os.path.getsize(path):
+        raise ValueError(f"Objeto {key} no S3 não confere com o arquivo enviado: checksum "
+                         f"{head.get('ChecksumSHA256')} (esperado {expected}), {head['ContentLength']} bytes "
+                         f"(esperado {os.path.getsize(path)})")
+    return expected
+
+def export_layer(database, s3, camada: str, tabelas: List[str], temp_dir: str):
+    """
+    Copia as tabelas de uma camada do pipeline dbt, com seus índices, para um arquivo DuckDB próprio
+    e o envia ao bucket S3. Roda em paralelo com as outras camadas, em um cursor da mesma instância
+    DuckDB, que compartilha o limite de memória e a leitura de local.duckdb.
+
+    Parâmetros:
+        database: Conexão DuckDB com local.duckdb anexado como db_origem.
+        s3: Cliente boto3 do S3, compartilhado entre as camadas.
+        camada (str): Nome da camada (bronze, silver, gold ou historico).
+        tabelas (list): Tabelas exportadas no arquivo da camada.
+        temp_dir (str): Diretório temporário dos arquivos exportados.
+
+    Retorno:
+        dict: Métricas da camada (tamanho, tempos de exportação e envio e checksum).
+    """
+    path = os.path.join(temp_dir, f"terceirizados_{camada}.duckdb")
+    start = time.perf_counter()
+    con = database.cursor()
+    try:
+        con.execute(f"ATTACH '{path}' AS camada_{camada}")
+        con.execute(f"USE camada_{camada}")
+        for tabela in tabelas:
+            con.execute(f"CREATE TABLE {tabela} AS SELECT * FROM db_origem.{tabela}")
+            #CREATE TABLE AS não copia índices: recria no arquivo exportado os índices criados pelo post_hook do DBT
+            indexes = con.execute("""
+                SELECT sql FROM duckdb_indexes()
+                WHERE database_name = 'db_origem' AND table_name = ?
+                """, [tabela]).fetchall()
+            for (index_sql,) in indexes:
+                con.execute(index_sql)
+        con.execute(f"CHECKPOINT camada_{camada}")
+        con.execute("USE memory")
+        con.execute(f"DETACH camada_{camada}")
+    finally:
+        con.close()
+    export_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    checksum = upload_verified(s3, path, f"terceirizados/{camada}/terceirizados_{camada}.duckdb")
+    upload_time = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {"camada": camada, "tabelas": ", ".join(tabelas), "tamanho_bytes": size,
+            "exportacao_segundos": round(export_time, 3), "envio_segundos": round(upload_time, 3),
+            "mb_por_segundo_envio": round(size/1024**2/upload_time, 2) if upload_time else None,
+            "checksum_sha256": checksum}
+
+def export_snapshot_object(con, s3, query: str, name: str, temp_dir: str, previous: dict):
+    """
+    Exporta o resultado de uma consulta como parquet e o envia ao bucket S3 apenas se o conteúdo mudou
+    em relação à versão anterior do snapshot (mesmo checksum). A chave do objeto inclui o checksum,
+    então objetos de versões anteriores nunca são sobrescritos.
+
+    Retorno:
+        tuple: Entrada do manifesto (chave, checksum e linhas) e se o objeto foi enviado.
+    """
+    path = os.path.join(temp_dir, "export.parquet")
+    con.execute(f"COPY ({query}) TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+    checksum = file_sha256(path)
+    if previous and previous.get("checksum") == checksum:
+        os.remove(path)
+        return previous, False
+    rows = con.execute(f"SELECT COUNT(*) FROM read_parquet('{path}')").fetchone()[0]
+    key = f"{GOLD_SNAPSHOT_PREFIX}/{name}/{checksum}.parquet"
+    upload_verified(s3, path, key)
+    os.remove(path)
+    return {"chave": key, "checksum": checksum, "linhas": rows}, True
+
+def publish_gold_snapshot(meses_carregados: List[str], full_refresh: bool, logger):
+    """
+    Publica a camada gold no bucket S3 em formato de snapshot versionado, consumido pela API para
+    atualizações incrementais: um parquet por mes_referencia da tabela gold, um parquet por tabela de
+    estatísticas (e o snapshot atual) e um manifesto com versão, checksum de cada objeto e índices das tabelas.
+
+    Só são exportados os meses carregados nesta execução e os meses ainda ausentes do manifesto
+    (ou todos, com full refresh), e só são enviados os objetos cujo checksum mudou. Objetos que deixaram
+    de ser usados ficam no bucket por mais uma versão, para não quebrar atualizações da API em andamento,
+    e são apagados na publicação seguinte.
+
+    Parâmetros:
+        meses_carregados (list): Meses de referência (YYYY-MM) carregados na task load_raw_data.
+        full_refresh (bool): Exporta novamente todos os meses.
+        logger: Logger da task.
+
+    Retorno:
+        dict: Versão publicada (ou mantida) e quantidade de objetos enviados.
+    """
+    s3 = create_s3_client()
+    try:
+        previous = json.loads(s3.get_object(Bucket=BUCKET_NAME, Key=GOLD_SNAPSHOT_MANIFEST_KEY)["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        previous = {"versao": None, "particoes": {}, "tabelas": {}, "indices": [], "indices_tabelas": {},
+                    "obsoletos": []}
+
+    temp_dir = tempfile.mkdtemp(prefix="terceirizados_gold_")
+    uploaded = 0
+    try:
+        with duckdb.connect('local.duckdb', read_only=True) as con:
+            months = [row[0].isoformat() for row in
+                      con.execute("SELECT DISTINCT mes_referencia FROM terceirizados_gold ORDER BY 1").fetchall()]
+            partitions = {}
+            for month in months:
+                previous_partition = previous["particoes"].get(month)
+                if previous_partition and not full_refresh and month[:7] not in (meses_carregados or []):
+                    partitions[month] = previous_partition
+                    continue
+                partitions[month], sent = export_snapshot_object(
+                    con, s3,
+                    f"SELECT * FROM terceirizados_gold WHERE mes_referencia = DATE '{month}' ORDER BY id_terceirizado",
+                    f"terceirizados_gold/mes_referencia={month}", temp_dir, previous_partition)
+                uploaded += sent
+
+            tables = {}
+            for table in LAYER_TABLES["gold"]:
+                if table == "terceirizados_gold":
+                    continue
+                tables[table], sent = export_snapshot_object(
+                    con, s3, f"SELECT * FROM {table}", table, temp_dir, previous["tabelas"].get(table))
+                uploaded += sent
+
+            indexes = [row[0] for row in con.execute("""
+                SELECT sql FROM duckdb_indexes()
+                WHERE database_name = 'local' AND table_name = 'terceirizados_gold'
+                ORDER BY index_name
+                """).fetchall()]
+            table_indexes = {}
+            for table, sql in con.execute("""
+                SELECT table_name, sql FROM duckdb_indexes()
+                WHERE database_name = 'local' AND table_name <> 'terceirizados_gold'
+                ORDER BY table_name, index_name
+                """).fetchall():
+                if table in tables:
+                    table_indexes.setdefault(table, []).append(sql)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if (partitions == previous["particoes"] and tables == previous["tabelas"] and indexes == previous["indices"]
+            and table_indexes == previous.get("indices_tabelas", {})):
+        logger.info(f"Snapshot da camada gold sem alterações. Versão mantida: {previous['versao']}")
+        return {"versao": previous["versao"], "objetos_enviados": 0}
+
+    for key in previous.get("obsoletos", []):
+        s3.delete_object(Bucket=BUCKET_NAME, Key=key)
+    current_keys = {entry["chave"] for entry in [*partitions.values(), *tables.values()]}
+    previous_keys = {entry["chave"] for entry in [*previous["particoes"].values(), *previous["tabelas"].values()]}
+    manifest = {
+        "versao": datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "tabela_principal": "terceirizados_gold",
+        "particoes": partitions,
+        "tabelas": tables,
+        "indices": indexes,
+        "indices_tabelas": table_indexes,
+        "obsoletos": sorted(previous_keys - current_keys)
+    }
+    s3.put_object(Bucket=BUCKET_NAME, Key=GOLD_SNAPSHOT_MANIFEST_KEY,
+                  Body=json.dumps(manifest, indent=2).encode("utf-8"), ContentType="application/json")
+    logger.info(f"Snapshot da camada gold publicado na versão {manifest['versao']}: "
+                f"{uploaded} objeto(s) enviado(s), {len(partitions)} partições e {len(tables)} tabelas de estatísticas")
+    return {"versao": manifest["versao"], "objetos_enviados": uploaded}
+
 #TASKS E FLOW
 @task(name="Criar Bucket S3")
 def create_bucket(run: bool):
@@ -88,10 +1587,8 @@ def create_bucket(run: bool):
     logger=get_run_logger()
     logger.info(f"Iniciando task create_bucket...")
     logger.info(f"Verificando existência e propriedade do bucket '{BUCKET_NAME}' na AWS S3")
-    s3 = boto3.client('s3', 
-                  region_name=AWS_REGION, 
-                  aws_access_key_id=AWS_ACCESS_KEY_ID,
-                  aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
+    metrics = StageMetrics("create_bucket")
+    s3 = create_s3_client()
 
     try:
         if not any(b['Name'] == BUCKET_NAME for b in s3.list_buckets()['Buckets']):
@@ -101,26 +1598,35 @@ def create_bucket(run: bool):
                 CreateBucketConfiguration={'LocationConstraint': AWS_REGION}
             )
             logger.info(f"Bucket '{BUCKET_NAME}' criado com sucesso!")
+            metrics.set(bucket=BUCKET_NAME, criado=True)
         else:
             logger.info(f"Bucket '{BUCKET_NAME}' já existe. Não é preciso criar um novo")
+            metrics.set(bucket=BUCKET_NAME, criado=False)
     except Exception as e:
         logger.error(f"Erro ao acessar ou criar o bucket: {e}")
         raise
+    metrics.publish(logger)
     logger.info(f"Task create_bucket finalizada com sucesso")
     return
 
 @task(name="Carregar Dados Brutos")
 def load_raw_data(run: bool, busca_automatica_dados_novos: bool, ano_inicio_carga: str, mes_inicio_carga: str, 
-                    ano_fim_carga: str, mes_fim_carga: str):
+                    ano_fim_carga: str, mes_fim_carga: str, workers_carga: int = 1,
+                    carga_streaming: bool = False, linhas_por_row_group: int = 100000, camada_raw_tipada: bool = False):
     """
     Carrega os dados brutos no bucket S3 com particionamento por mês de carga.
 
     Etapas:
         1. Identifica arquivos disponíveis no site de fonte.
-        2. Filtra os arquivos conforme o período informado nos parâmetros.
-        3. Faz download do arquivo.
+        2. Filtra os arquivos conforme o período informado nos parâmetros ou, na busca automática,
+           seleciona os meses novos ou alterados na fonte segundo o manifesto de ingestão.
+        3. Faz download do arquivo, com conexões HTTP reaproveitadas e retomada de transferências interrompidas.
         4. Lê com DuckDB.
         5. Exporta para o bucket S3 no formato parquet, particionando por mês de carga. 
+        As etapas 3 a 5 rodam em paralelo para até `workers_carga` arquivos. Com `carga_streaming`,
+        arquivos csv são convertidos durante o download, sem arquivo temporário.
+        6. Com `camada_raw_tipada`, grava também o parquet tipado de cada mês carregado e dos meses
+           já carregados que ainda não têm parquet tipado.
 
     Parâmetros:
         run (bool): Indica se a task deve ser executada.
@@ -128,177 +1634,131 @@ def load_raw_data(run: bool, busca_automatica_dados_novos: bool, ano_inicio_carg
         mes_inicio_carga (str): Mês inicial da carga.
         ano_fim_carga (str): Ano final da carga.
         mes_fim_carga (str): Mês final da carga.
+        workers_carga (int): Quantidade de arquivos processados simultaneamente.
+        carga_streaming (bool): Converte arquivos csv para parquet durante o download.
+        linhas_por_row_group (int): Linhas por row group do parquet na carga em streaming.
+        camada_raw_tipada (bool): Grava também a camada raw tipada, lida pelo DBT.
 
     Retorno:
-        None
+        list: Meses de referência (YYYY-MM) carregados.
     """
     if not run:
         return
     #Variáveis
     logger=get_run_logger()
     logger.info("Iniciando task load_raw_data...")
-    encodings = ["utf-8", "latin-1", "utf-16"]
+    metrics=StageMetrics("load_raw_data")
     new_data=[]
     
     #Pesquisa de arquivos no site
     logger.info("Pesquisando os arquivos disponíveis para carga...")
-    url_base_dados="https://www.gov.br/cgu/pt-br/acesso-a-informacao/dados-abertos/arquivos/terceirizados"
-    response = requests.get(url_base_dados)
-    files=re.findall(rf'href=["\']?({url_base_dados}/arquivos/[^\s"\'>]+\.(csv|xlsx))["\']?', response.text)
+    url_base_dados=URL_BASE_DADOS
+    session=create_http_session(workers_carga)
+    page=get_page(session, url_base_dados, logger)
+    files=re.findall(rf'href=["\']?({url_base_dados}/arquivos/[^\s"\'>]+\.(csv|xlsx))["\']?', page)
 
-    #Pegar último mês de carga caso use busca automática de novos dados
-    if busca_automatica_dados_novos:
-        end_month=300000
-        try:
-            with duckdb.connect() as con:
-                con.execute("INSTALL httpfs; LOAD httpfs;")
-                con.execute(f"""
-                    SET s3_region='{AWS_REGION}';
-                    SET s3_access_key_id='{AWS_ACCESS_KEY_ID}';
-                    SET s3_secret_access_key='{AWS_SECRET_ACCESS_KEY}';
-                    """)
-                max_month_result=con.sql(f"SELECT MAX(mes_referencia) FROM 's3://{BUCKET_NAME}/terceirizados/raw/*/*.parquet'").fetchone()
-                if max_month_result and max_month_result[0]:
-                    max_month = max_month_result[0]
-                    year = max_month.year
-                    month = max_month.month
-                    init_month = int(f"{year}{month:02d}") + 1
-                else:
-                    init_month = 201901
+    #Listar links com o ano-mês (YYYYMM) de cada arquivo
+    source_files=[]
+    for file in files:
+        yearmonth=file[0].replace('maio', '202505').replace('setembro', '202509')
+        source_files.append((file[0], file[1], re.search(r'\d{6}', yearmonth).group()))
 
-        except Exception as e:
-            logger.warning(f"Erro de conexão com o banco na busca da última atualização: {e}\nBaixando todos os dados...")
-            init_month = 201901
+    ingestion_manifest=IngestionManifest()
+    dialect_manifest=DialectManifest()
+
+    #Buscar meses novos ou republicados na fonte caso use busca automática de novos dados
+    if busca_automatica_dados_novos:
+        logger.info("Verificando arquivos novos ou alterados na fonte com base no manifesto de ingestão...")
+        filtered_files=find_new_or_changed_files(session, source_files, ingestion_manifest, dialect_manifest, workers_carga, logger)
 
     #Usar filtros manuais de data se busca automática não for true
     else:
         init_month=int(ano_inicio_carga+mes_inicio_carga)
         end_month=int(ano_fim_carga+mes_fim_carga)
-
-    #Listar links filtrados a serem baixados em ordem crescente de data
-    filtered_files=[]
-    for file in files:
-        yearmonth=file[0].replace('maio', '202505').replace('setembro', '202509')
-        file=(file[0], file[1], re.search(r'\d{6}', yearmonth).group())        
-        if int(file[2])>=init_month and int(file[2])<=end_month:
-            filtered_files.append(file)
+        filtered_files=[file for file in source_files if int(file[2])>=init_month and int(file[2])<=end_month]
 
     filtered_files = sorted(filtered_files, key=lambda x: int(x[2]))
     numero_arquivos=len(filtered_files)
     logger.info(f"{numero_arquivos} arquivos encontrados")
-    if numero_arquivos==0:
+
+    #Meses já carregados sem parquet tipado (ex: carregados antes de ativar a camada raw tipada)
+    typed_backfill=[]
+    if camada_raw_tipada:
+        loading={file[2][:4] + '-' + file[2][4:] for file in filtered_files}
+        typed_backfill=[month for month in months_without_typed_parquet() if month not in loading]
+        if typed_backfill:
+            logger.info(f"{len(typed_backfill)} meses já carregados sem parquet tipado: {typed_backfill}")
+
+    if numero_arquivos==0 and not typed_backfill:
+        session.close()
+        ingestion_manifest.save()
+        metrics.set(arquivos=0, linhas=0)
+        metrics.publish(logger)
         logger.info(f"Não há arquivos para carregar. Encerrando task")
-        return
+        return new_data
 
-    #Baixar, ler e subir cada arquivo para S3
-    for file in filtered_files:
-        link=file[0]
-        filetype=file[1]
-        year_month=file[2][:4] + '-' + file[2][4:]
-        
-        logger.info(f"Baixando arquivo de {year_month}:\n -Tipo do arquivo: {filetype}\n -Link: {link}")
-        retry=1
-        while retry<=5:
-            try:
-                with requests.get(link, stream=True, timeout=120) as r:
-                    r.raise_for_status()
-                    with open("temp_data", "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                logger.info(f"Arquivo {link} baixado com sucesso")
-                break
-            except Exception as e:
-                if retry==5:
-                    logger.error(f"Todas as tentativas falharam")
-                    raise
-                else:
-                    retry+=1 
-                    logger.warning(f"Falha ao tentar baixar o arquivo {link}: \n{e}\nTentando novamente ({retry} de 5)...")
-                    time.sleep(3)
-
-        logger.info(f"Enviando arquivo de {year_month} para bucket '{BUCKET_NAME}' na AWS S3")
-        con = duckdb.connect(":memory:")
-        if filetype=="xlsx":
-            con.execute("INSTALL excel; LOAD excel;")
-        con.execute("INSTALL httpfs; LOAD httpfs;") 
-        con.execute(f"""
-            SET s3_region='{AWS_REGION}';
-            SET s3_access_key_id='{AWS_ACCESS_KEY_ID}';
-            SET s3_secret_access_key='{AWS_SECRET_ACCESS_KEY}';
-            """)
-        con.sql(f"""
-                    CREATE TABLE new_data (                             
-                        id_terc VARCHAR,
-                        sg_orgao_sup_tabela_ug VARCHAR,
-                        cd_ug_gestora VARCHAR,
-                        nm_ug_tabela_ug VARCHAR,
-                        sg_ug_gestora VARCHAR,
-                        nr_contrato VARCHAR,
-                        nr_cnpj VARCHAR,
-                        nm_razao_social VARCHAR,
-                        nr_cpf VARCHAR,
-                        nm_terceirizado VARCHAR,
-                        nm_categoria_profissional VARCHAR,
-                        nm_escolaridade VARCHAR,
-                        nr_jornada VARCHAR,
-                        nm_unidade_prestacao VARCHAR,
-                        vl_mensal_salario VARCHAR,
-                        vl_mensal_custo VARCHAR,
-                        Num_Mes_Carga VARCHAR,
-                        Mes_Carga VARCHAR,
-                        Ano_Carga VARCHAR,
-                        sg_orgao VARCHAR,
-                        nm_orgao VARCHAR,
-                        cd_orgao_siafi VARCHAR,
-                        cd_orgao_siape VARCHAR,
-                        mes_referencia DATE
-                        );
-                        """)
-        #Tentar diferentes encodings antes de falha para lidar com arquivos csv com encodings diferentes (encontrados utf-8 e latin-1)
-        last_error=None
-        for encoding in encodings:
-            csv_extra_option = f", quote='\"', encoding='{encoding}'" if filetype=="csv" else ""
-            try:   
-                con.sql(f"""
-                    INSERT INTO new_data
-                        SELECT 
-                            *, 
-                            TRY_CAST('{year_month}-01' AS DATE) AS mes_referencia
-                        FROM read_{filetype}('temp_data', all_varchar = true {csv_extra_option});
-                            """)
-                if filetype=="csv":
-                    logger.info(f"Encoding reconhecido no csv: {encoding}")
-                break
-            except Exception as e:
-                if filetype=="xlsx":
-                    raise e
-                logger.warning(f"Falha ao tentar encoding {encoding}: \n{e}")
-                last_error=e
-        else:
-            raise last_error
-            
-        con.execute(f"""
-            COPY new_data
-                TO 's3://{BUCKET_NAME}/terceirizados/raw/mes_referencia={year_month}-01/terceirizados.parquet'
-                (FORMAT PARQUET, OVERWRITE)
-                """)
-        con.close()
-            
-        logger.info(f"Dados de {year_month} carregados com sucesso no bucket")
-        new_data.append(year_month)
+    #Baixar, ler e subir os arquivos para S3, até workers_carga arquivos ao mesmo tempo
+    workers=min(workers_carga, max(numero_arquivos, len(typed_backfill)))
+    logger.info(f"Carregando arquivos com {workers} worker(s)")
+    start=time.perf_counter()
+    temp_dir=tempfile.mkdtemp(prefix="terceirizados_raw_")
+    pool=DuckDBConnectionPool(workers)
+    executor=ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures=[executor.submit(process_file, pool, session, dialect_manifest, file, temp_dir, logger,
+                                 carga_streaming, linhas_por_row_group, camada_raw_tipada) for file in filtered_files]
+        for future in as_completed(futures):
+            result=future.result()
+            entry=ingestion_manifest.record(result["year_month"], result["link"], result["signature"], result["rows"])
+            metrics.add_item(mes_referencia=result["year_month"], linhas=result["rows"],
+                             tamanho_parquet_bytes=entry["tamanho_parquet_bytes"], **result["metrics"])
+            new_data.append(result["year_month"])
+        for future in as_completed([executor.submit(backfill_typed_parquet, pool, month, logger) for month in typed_backfill]):
+            future.result()
+    except Exception:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        pool.close()
+        session.close()
+        dialect_manifest.save()
+        ingestion_manifest.save()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    new_data=sorted(new_data)
+    elapsed=time.perf_counter()-start
+    logger.info(f"{numero_arquivos} arquivos carregados em {elapsed:.1f}s")
+    total_rows=sum(item["linhas"] for item in metrics.items)
+    total_bytes=sum(item["bytes_baixados"] for item in metrics.items)
+    metrics.set(arquivos=numero_arquivos, workers=workers, streaming=carga_streaming, raw_tipada=camada_raw_tipada,
+                meses_tipados_retroativos=len(typed_backfill), linhas=total_rows,
+                bytes_baixados=total_bytes, bytes_parquet=sum(item["tamanho_parquet_bytes"] or 0 for item in metrics.items),
+                tentativas_extras=sum(item["tentativas_extras"] for item in metrics.items),
+                carga_segundos=round(elapsed, 3), linhas_por_segundo=round(total_rows/elapsed) if elapsed else None,
+                mb_por_segundo=round(total_bytes/1024**2/elapsed, 2) if elapsed else None)
+    metrics.publish(logger)
 
     logger.info(f"Task load_raw_data finalizada com sucesso\nForam carregados dados dos meses: {new_data}")
-    return
+    return new_data
 
 @task(name="Rodar DBT")
-def dbt_run(run: bool, comando_dbt: str):
+def dbt_run(run: bool, comando_dbt: str, meses_carregados: List[str] = None, full_refresh: bool = False,
+            perfil_dbt: str = "dev", raw_tipado: bool = False, qualidade_amostra_percentual: int = 100):
     """
     Executa comando DBT localmente, criando camadas bronze, silver e gold.
 
+    Os modelos são incrementais por mes_referencia: apenas os meses carregados na task load_raw_data
+    são lidos e substituídos em cada camada. Sem meses informados, são processados apenas os meses
+    posteriores ao último já presente em cada modelo.
+
     Parâmetros:
         run (bool): Indica se a task deve ser executada.
         comando_dbt (str): Comando DBT a ser executado (build, run ou test).
+        meses_carregados (list): Meses de referência (YYYY-MM) carregados na task load_raw_data.
+        full_refresh (bool): Reconstrói os modelos a partir de todos os dados brutos.
+        perfil_dbt (str): Target do profiles.yml (dev ou performance).
+        raw_tipado (bool): Lê a camada bronze da camada raw tipada (var `raw_tipado` do DBT).
+        qualidade_amostra_percentual (int): Percentual das linhas verificadas no relatório de qualidade.
 
     Retorno:
         None
@@ -306,28 +1766,65 @@ def dbt_run(run: bool, comando_dbt: str):
     if not run:
         return
     logger=get_run_logger()
-    logger.info(f"Iniciando task dbt_run...\nComando: dbt {comando_dbt}")
-    PrefectDbtRunner(
-        settings=PrefectDbtSettings(
-            project_dir="dbt_pipeline",
-            profiles_dir="dbt_pipeline"
-        )
-    ).invoke([f"{comando_dbt}"])
-    logger.info("Task dbt_run finalizada com sucesso")
+    args=[comando_dbt, "--target", perfil_dbt]
+    if perfil_dbt=="performance":
+        configure_dbt_resources(logger)
+    for name, value in s3_endpoint_settings().items():
+        os.environ[f"DUCKDB_{name.upper()}"]=value
+    dbt_vars={}
+    if meses_carregados:
+        dbt_vars["meses_carregados"]=meses_carregados
+    if raw_tipado:
+        dbt_vars["raw_tipado"]=True
+    if qualidade_amostra_percentual<100:
+        dbt_vars["qualidade_amostra_percentual"]=qualidade_amostra_percentual
+    #Lista os arquivos da camada raw uma única vez: a source do DBT lê essa lista, sem listar o S3 a cada consulta
+    raw_files=list_partition_files(TYPED_RAW_PREFIX if raw_tipado else RAW_PREFIX)
+    if raw_files:
+        dbt_vars["arquivos_raw"]=[f"s3://{BUCKET_NAME}/{key}" for key in raw_files.values()]
+    if full_refresh and comando_dbt!="test":
+        args.append("--full-refresh")
+    command=" ".join(args)
+    logged_vars=json.dumps({name: value for name, value in dbt_vars.items() if name!="arquivos_raw"})
+    if dbt_vars:
+        args+=["--vars", json.dumps(dbt_vars)]
+    logger.info(f"Iniciando task dbt_run...\nComando: dbt {command}\nVars: {logged_vars}\n"
+                f"Arquivos da camada raw: {len(raw_files)}")
+    metrics=StageMetrics("dbt_run")
+    start=time.perf_counter()
+    with ResourceSampler() as sampler:
+        PrefectDbtRunner(
+            settings=PrefectDbtSettings(
+                project_dir=DBT_PROJECT_DIR,
+                profiles_dir=DBT_PROJECT_DIR
+            )
+        ).invoke(args)
+    for item in report_dbt_models(sampler, logger):
+        metrics.add_item(**item)
+    metrics.set(**report_data_quality(logger))
+    elapsed=time.perf_counter()-start
+    metrics.set(comando=command, vars=logged_vars, arquivos_raw=len(raw_files), perfil=perfil_dbt, nos=len(metrics.items), dbt_segundos=round(elapsed, 3))
+    metrics.publish(logger)
+    logger.info(f"Task dbt_run finalizada com sucesso em {elapsed:.1f}s")
     return
 
 @task(name="Carregar Dados Transformados")
-def load_transformed_data(run: bool):
+def load_transformed_data(run: bool, meses_carregados: List[str] = None, full_refresh: bool = False):
     """
     Carrega os dados transformados no bucket S3.
 
     Etapas:
-        1. Copia cada tabela do banco (camada do pipeline dbt) como um novo arquivo DuckDB.
-        2. Envia para S3 cada camada como bancos de dados indpendentes.
-        3. Dispara atualização da API via endpoint HTTP.
+        1. Copia as tabelas de cada camada do pipeline dbt, com seus índices, como um novo arquivo DuckDB.
+           O arquivo da camada gold inclui as tabelas de estatísticas consumidas pela API.
+        2. Envia para S3 cada camada como bancos de dados indpendentes, em partes paralelas e com checksum
+           SHA-256 conferido após o envio. As camadas são exportadas e enviadas em paralelo.
+        3. Publica a camada gold como snapshot versionado particionado por mês, enviando apenas as partições alteradas.
+        4. Dispara atualização da API via endpoint HTTP.
 
     Parâmetros:
         run (bool): Indica se a task deve ser executada.
+        meses_carregados (list): Meses de referência (YYYY-MM) carregados na task load_raw_data.
+        full_refresh (bool): Exporta novamente todas as partições do snapshot da camada gold.
 
     Retorno:
         None
@@ -336,27 +1833,36 @@ def load_transformed_data(run: bool):
         return
     logger=get_run_logger()
     logger.info("Iniciando task load_transformed_data...")
-    for camada in ["bronze", "silver", "gold"]:
-        if os.path.exists('temp.duckdb'):
-            os.remove('temp.duckdb')
-        with duckdb.connect('temp.duckdb') as con:
-            con.execute("ATTACH 'local.duckdb' AS db_origem (READ_ONLY)")
-            con.execute(f"CREATE TABLE terceirizados_{camada} AS SELECT * FROM db_origem.terceirizados_{camada}")
-            s3 = boto3.client('s3', 
-                  region_name=AWS_REGION, 
-                  aws_access_key_id=AWS_ACCESS_KEY_ID,
-                  aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
-            s3.upload_file("temp.duckdb", BUCKET_NAME, f"terceirizados/{camada}/terceirizados_{camada}.duckdb")
-        
-        logger.info(f"Tabela terceirizados_{camada} carregada com sucesso")
+    metrics=StageMetrics("load_transformed_data")
+    #As camadas são exportadas em paralelo, cada uma no seu arquivo temporário, com um único cliente S3
+    s3 = create_s3_client()
+    temp_dir = tempfile.mkdtemp(prefix="terceirizados_camadas_")
+    start=time.perf_counter()
+    try:
+        with duckdb.connect() as database, ThreadPoolExecutor(max_workers=len(LAYER_TABLES)) as executor:
+            database.execute("ATTACH 'local.duckdb' AS db_origem (READ_ONLY)")
+            futures = [executor.submit(export_layer, database, s3, camada, tabelas, temp_dir)
+                       for camada, tabelas in LAYER_TABLES.items()]
+            for future in as_completed(futures):
+                item = future.result()
+                metrics.add_item(**item)
+                logger.info(f"Camada {item['camada']} carregada com sucesso (tabelas: {item['tabelas']}, "
+                            f"checksum SHA-256: {item['checksum_sha256']})")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    metrics.set(camadas_segundos=round(time.perf_counter()-start, 3))
+
+    start=time.perf_counter()
+    snapshot=publish_gold_snapshot(meses_carregados, full_refresh, logger)
+    metrics.set(snapshot_versao=snapshot["versao"], snapshot_objetos_enviados=snapshot["objetos_enviados"],
+                snapshot_segundos=round(time.perf_counter()-start, 3))
+    metrics.publish(logger)
 
-    if os.path.exists('temp.duckdb'):
-            os.remove('temp.duckdb')
     try:
         logger.info("Atualizando dados da api...")
-        response = requests.post("http://fast-api:8000/admin/refresh", timeout=60)
+        response = requests.post(f"{URL_API}/admin/refresh", timeout=60)
         response.raise_for_status()
-        logger.info("Atualização da api executada com sucesso!")
+        logger.info(f"Atualização da api agendada com sucesso (job {response.json()['job_id']})")
     except Exception as e:
         logger.error(f"Erro ao chamar refresh da API: {e}")
 
@@ -386,6 +1892,7 @@ def pipeline(Geral: FlowParameters = FlowParameters(), Carga_Manual: ManualLoadP
         - ano_fim_carga: Ano final da carga
         - mes_fim_carga: Mês final da carga
         - comando_dbt: Comando DBT a ser executado
+        - dbt_full_refresh: Reconstrói os modelos DBT do zero
 
     Fluxo:
         create_bucket → load_raw_data → dbt_run → load_transformed_data
@@ -394,7 +1901,12 @@ def pipeline(Geral: FlowParameters = FlowParameters(), Carga_Manual: ManualLoadP
     new_data=load_raw_data.submit(run = "Carregar dados brutos" in Geral.tasks, wait_for=[bucket],
                            busca_automatica_dados_novos=Geral.busca_automatica_dados_novos,
                            ano_inicio_carga=str(Carga_Manual.ano_inicio_carga), mes_inicio_carga=Carga_Manual.mes_inicio_carga,
-                           ano_fim_carga=str(Carga_Manual.ano_fim_carga), mes_fim_carga=Carga_Manual.mes_fim_carga)
+                           ano_fim_carga=str(Carga_Manual.ano_fim_carga), mes_fim_carga=Carga_Manual.mes_fim_carga,
+                           workers_carga=Geral.workers_carga, carga_streaming=Geral.carga_streaming,
+                           linhas_por_row_group=Geral.linhas_por_row_group, camada_raw_tipada=Geral.camada_raw_tipada)
     dbt_result=dbt_run.submit(run = "Rodar DBT" in Geral.tasks, wait_for=[new_data],
-                       comando_dbt=Geral.comando_dbt)
-    duckdb_uploaded=load_transformed_data(run = "Rodar DBT" in Geral.tasks and Geral.comando_dbt != "test", wait_for=[dbt_result])
+                       comando_dbt=Geral.comando_dbt, meses_carregados=new_data,
+                       full_refresh=Geral.dbt_full_refresh, perfil_dbt=Geral.perfil_dbt, raw_tipado=Geral.camada_raw_tipada,
+                       qualidade_amostra_percentual=Geral.qualidade_amostra_percentual)
+    duckdb_uploaded=load_transformed_data(run = "Rodar DBT" in Geral.tasks and Geral.comando_dbt != "test", wait_for=[dbt_result],
+                                          meses_carregados=new_data, full_refresh=Geral.dbt_full_refresh)